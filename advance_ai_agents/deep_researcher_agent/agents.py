@@ -1,31 +1,53 @@
 import os
+import queue
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
+import httpx
 from agno.agent import Agent
 from agno.models.nebius import Nebius
 from dotenv import load_dotenv
-from typing import Iterator
+from typing import Iterator, List, Optional
 from agno.utils.log import logger
 from agno.utils.pprint import pprint_run_response
-from agno.tools.scrapegraph import ScrapeGraphTools
 from agno.workflow import RunEvent, RunResponse, Workflow
 from pydantic import BaseModel, Field
+from research_cache import CachedScrapeGraphTools, get_research_cache
 
 load_dotenv()
 
+# Number of sub-queries the topic is split into; each one is researched concurrently
+RESEARCH_SUBQUERIES = int(os.getenv("RESEARCH_SUBQUERIES", "3"))
+# Pre-warmed workflow instances shared by concurrent research requests
+RESEARCH_POOL_SIZE = int(os.getenv("RESEARCH_POOL_SIZE", "4"))
 
-class DeepResearcherAgent(Workflow):
-    """
-    A multi-stage research workflow that:
-    1. Gathers information from the web using advanced scraping tools.
-    2. Analyzes and synthesizes the findings.
-    3. Produces a clear, well-structured report.
-    """
+# One connection pool for every Nebius model, so TLS connections are reused across runs
+_http_client = httpx.Client(
+    timeout=httpx.Timeout(300.0, connect=10.0),
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+)
 
-    # Searcher: Finds and extracts relevant information from the web
-    searcher: Agent = Agent(
-        tools=[ScrapeGraphTools(api_key=os.getenv("SGAI_API_KEY"))],
-        model=Nebius(
-            id="deepseek-ai/DeepSeek-V3-0324", api_key=os.getenv("NEBIUS_API_KEY")
-        ),
+
+def make_model() -> Nebius:
+    return Nebius(
+        id="deepseek-ai/DeepSeek-V3-0324",
+        api_key=os.getenv("NEBIUS_API_KEY"),
+        http_client=_http_client,
+    )
+
+
+class ResearchPlan(BaseModel):
+    queries: List[str] = Field(
+        ..., description="Focused, non-overlapping web research queries that together cover the topic."
+    )
+
+
+def make_searcher() -> Agent:
+    """Searcher: finds and extracts relevant information from the web."""
+    return Agent(
+        tools=[CachedScrapeGraphTools(api_key=os.getenv("SGAI_API_KEY"))],
+        model=make_model(),
         show_tool_calls=True,
         markdown=True,
         description=(
@@ -45,11 +67,28 @@ class DeepResearcherAgent(Workflow):
         ),
     )
 
-    # Analyst: Synthesizes and interprets the research findings
-    analyst: Agent = Agent(
-        model=Nebius(
-            id="deepseek-ai/DeepSeek-V3-0324", api_key=os.getenv("NEBIUS_API_KEY")
+
+def make_planner() -> Agent:
+    """Planner: splits the topic into sub-queries that can be researched in parallel."""
+    return Agent(
+        model=make_model(),
+        response_model=ResearchPlan,
+        use_json_mode=True,
+        description=(
+            "You are PlannerBot-X. You break a research topic into a few focused web research queries."
+        ),
+        instructions=(
+            f"1. Return at most {RESEARCH_SUBQUERIES} queries.\n"
+            "2. Each query must cover a distinct aspect of the topic; avoid overlap.\n"
+            "3. If the topic is narrow, return a single query that restates it."
         ),
+    )
+
+
+def make_analyst() -> Agent:
+    """Analyst: synthesizes and interprets the research findings."""
+    return Agent(
+        model=make_model(),
         markdown=True,
         description=(
             "You are AnalystBot-X, a critical thinker who synthesizes research findings "
@@ -69,11 +108,11 @@ class DeepResearcherAgent(Workflow):
         ),
     )
 
-    # Writer: Produces a final, polished report
-    writer: Agent = Agent(
-        model=Nebius(
-            id="deepseek-ai/DeepSeek-V3-0324", api_key=os.getenv("NEBIUS_API_KEY")
-        ),
+
+def make_writer() -> Agent:
+    """Writer: produces a final, polished report."""
+    return Agent(
+        model=make_model(),
         markdown=True,
         description=(
             "You are WriterBot-X, a professional technical writer. Your job is to craft "
@@ -92,6 +131,89 @@ class DeepResearcherAgent(Workflow):
         ),
     )
 
+
+class DeepResearcherAgent(Workflow):
+    """
+    A multi-stage research workflow that:
+    1. Gathers information from the web using advanced scraping tools.
+    2. Analyzes and synthesizes the findings.
+    3. Produces a clear, well-structured report.
+
+    Agents keep per-run state, so every instance builds its own agents (including one searcher
+    per sub-query) instead of sharing class-level ones.
+    """
+
+    planner: Agent
+    searchers: List[Agent]
+    analyst: Agent
+    writer: Agent
+
+    def __post_init__(self):
+        self.planner = make_planner()
+        self.searchers = [make_searcher() for _ in range(max(1, RESEARCH_SUBQUERIES))]
+        self.analyst = make_analyst()
+        self.writer = make_writer()
+        self.new_session()
+
+    @property
+    def searcher(self) -> Agent:
+        return self.searchers[0]
+
+    def agents(self) -> List[Agent]:
+        return [self.planner, *self.searchers, self.analyst, self.writer]
+
+    def new_session(self) -> None:
+        """Start a fresh session with cleared agent memory, so reused instances never leak history."""
+        self.session_id = str(uuid4())
+        self.session_state = {}
+        for agent in self.agents():
+            agent.new_session()
+            agent.session_id = self.session_id
+
+    def plan(self, topic: str) -> List[str]:
+        """Split the topic into sub-queries, falling back to the topic itself."""
+        if RESEARCH_SUBQUERIES <= 1:
+            return [topic]
+        try:
+            plan = self.planner.run(topic).content
+            queries = [q.strip() for q in plan.queries if q and q.strip()][:RESEARCH_SUBQUERIES]
+        except Exception as e:
+            logger.warning(f"Research planning failed, searching the topic directly: {e}")
+            queries = []
+        return queries or [topic]
+
+    def search(self, query: str, searcher: Optional[Agent] = None) -> str:
+        """Research one sub-query; findings are cached so repeated or overlapping topics skip the web."""
+        cache = get_research_cache()
+        cached = cache.get("findings", query)
+        if cached is not None:
+            logger.info(f"Using cached findings for: {query}")
+            return cached
+        findings = (searcher or self.searcher).run(query).content or ""
+        if findings:
+            cache.put("findings", findings, query)
+        return findings
+
+    def research(self, topic: str) -> str:
+        """Step 1: fan the sub-queries out concurrently and merge their findings in plan order."""
+        queries = self.plan(topic)
+        logger.info(f"Researching {len(queries)} sub-queries")
+        if len(queries) == 1:
+            return self.search(queries[0])
+        with ThreadPoolExecutor(max_workers=len(queries), thread_name_prefix="searcher") as executor:
+            findings = list(executor.map(self.search, queries, self.searchers))
+        return "\n\n".join(
+            f"## Findings: {query}\n\n{content}" for query, content in zip(queries, findings) if content
+        )
+
+    def analyze(self, research_content: str) -> str:
+        """Step 2: synthesize the findings."""
+        return self.analyst.run(research_content).content
+
+    def write(self, analysis: str) -> Iterator[RunResponse]:
+        """Step 3: stream the final report."""
+        return self.writer.run(analysis, stream=True)
+
     def run(self, topic: str) -> Iterator[RunResponse]:
         """
         Orchestrates the research, analysis, and report writing process for a given topic.
@@ -99,34 +221,75 @@ class DeepResearcherAgent(Workflow):
         logger.info(f"Running deep researcher agent for topic: {topic}")
 
         # Step 1: Research
-        research_content = self.searcher.run(topic)
-        # logger.info(f"Searcher content: {research_content.content}")
+        research_content = self.research(topic)
 
         logger.info("Analysis started")
         # Step 2: Analysis
-        analysis = self.analyst.run(research_content.content)
-        # logger.info(f"Analyst analysis: {analysis.content}")
+        analysis = self.analyze(research_content)
 
         logger.info("Report Writing Started")
         # Step 3: Report Writing
-        report = self.writer.run(analysis.content, stream=True)
-        yield from report
+        yield from self.write(analysis)
 
 
-def run_research(query: str) -> str:
-    agent = DeepResearcherAgent()
-    final_report_iterator = agent.run(
-        topic=query,
-    )
+class WorkflowPool:
+    """
+    Fixed-size pool of pre-built DeepResearcherAgent instances.
+    Each checkout gets exclusive use of one instance with a fresh session;
+    callers beyond `size` wait for an instance to be returned.
+    """
+
+    def __init__(self, size: int = RESEARCH_POOL_SIZE):
+        self.size = max(1, size)
+        self._idle: "queue.Queue[DeepResearcherAgent]" = queue.Queue()
+        for _ in range(self.size):
+            self._idle.put(DeepResearcherAgent())
+
+    @contextmanager
+    def acquire(self, timeout: Optional[float] = None) -> Iterator[DeepResearcherAgent]:
+        try:
+            agent = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No research workflow free after {timeout}s") from None
+        try:
+            agent.new_session()
+            yield agent
+        finally:
+            self._idle.put(agent)
+
+
+_pool: Optional[WorkflowPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_workflow_pool() -> WorkflowPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = WorkflowPool()
+        return _pool
+
+
+def stream_research(query: str) -> Iterator[tuple[str, str]]:
+    """
+    Yield (stage, content) pairs: one status message as each stage starts,
+    then ("report", chunk) for every streamed piece of the final report.
+    """
+    with get_workflow_pool().acquire() as agent:
+        yield "research", "Researching: finding and extracting relevant information from the web..."
+        research_content = agent.research(query)
+        yield "analysis", "Analyzing: synthesizing and interpreting the research findings..."
+        analysis = agent.analyze(research_content)
+        yield "writing", "Writing report..."
+        for chunk in agent.write(analysis):
+            if chunk.content:
+                yield "report", chunk.content
     logger.info("Report Generated")
 
-    # Collect all streaming content into a single string
-    full_report = ""
-    for chunk in final_report_iterator:
-        if chunk.content:
-            full_report += chunk.content
 
-    return full_report
+def run_research(query: str) -> str:
+    # Collect all streaming content into a single string
+    return "".join(content for stage, content in stream_research(query) if stage == "report")
 
 
 if __name__ == "__main__":
@@ -61,26 +61,27 @@ if user_input:
             # PHASE 1: Researching
             phase1_msg = "🧠 **Phase 1: Researching** - Finding and extracting relevant information from the web..."
             status.write(phase1_msg)
-            research_content = agent.searcher.run(user_input)
+            research_content = agent.research(user_input)
 
             # PHASE 2: Analyzing
             phase2_msg = "🔬 **Phase 2: Analyzing** - Synthesizing and interpreting the research findings..."
             status.write(phase2_msg)
-            analysis = agent.analyst.run(research_content.content)
+            analysis = agent.analyze(research_content)
 
             # PHASE 3: Writing Report
             phase3_msg = (
                 "✍️ **Phase 3: Writing Report** - Producing a final, polished report..."
             )
             status.write(phase3_msg)
-            report_iterator = agent.writer.run(analysis.content, stream=True)
+            report_iterator = agent.write(analysis)
 
         # Move report display outside of status block
-        full_report = ""
+        report_parts = []
         report_container = st.empty()
         for chunk in report_iterator:
             if chunk.content:
-                full_report += chunk.content
+                report_parts.append(chunk.content)
+                full_report = "".join(report_parts)
                 cleaned_report = re.sub(r"^```(?:[a-zA-Z]*)?\n?", "", full_report)
                 cleaned_report = re.sub(r"\n?```$", "", cleaned_report)
                 report_container.markdown(cleaned_report, unsafe_allow_html=True)
@@ -0,0 +1,99 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from agno.tools.scrapegraph import ScrapeGraphTools
+
+RESEARCH_CACHE_FILE = os.getenv("RESEARCH_CACHE_FILE", "research_cache.db")
+# Web content goes stale; cached entries older than this are ignored
+RESEARCH_CACHE_TTL = int(os.getenv("RESEARCH_CACHE_TTL", str(24 * 60 * 60)))
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+class ResearchCache:
+    """
+    On-disk cache (SQLite, WAL) for scrape results and per-sub-query findings.
+    Entries are keyed by kind plus a hash of their normalized inputs and expire after `ttl` seconds.
+    """
+
+    def __init__(self, path: str = RESEARCH_CACHE_FILE, ttl: int = RESEARCH_CACHE_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS research_cache (
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (kind, key)
+            )"""
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        return hashlib.sha256("\n".join(normalize_text(part) for part in parts).encode("utf-8")).hexdigest()
+
+    def get(self, kind: str, *parts: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM research_cache WHERE kind = ? AND key = ?",
+                (kind, self.make_key(*parts)),
+            ).fetchone()
+        if row is None or time.time() - row[1] > self.ttl:
+            return None
+        return row[0]
+
+    def put(self, kind: str, value: str, *parts: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO research_cache (kind, key, value, created_at) VALUES (?, ?, ?, ?)",
+                (kind, self.make_key(*parts), value, time.time()),
+            )
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_research_cache() -> ResearchCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResearchCache()
+        return _cache
+
+
+class CachedScrapeGraphTools(ScrapeGraphTools):
+    """ScrapeGraphTools whose smartscraper results are cached per (prompt, url)."""
+
+    def smartscraper(self, url: str, prompt: str) -> str:
+        """Extract structured data from a webpage using LLM.
+        Args:
+            url (str): The URL to scrape
+            prompt (str): Natural language prompt describing what to extract
+        Returns:
+            The structured data extracted from the webpage
+        """
+        cache = get_research_cache()
+        cached = cache.get("smartscraper", prompt, url)
+        if cached is not None:
+            return cached
+
+        result = super().smartscraper(url, prompt)
+        # Errors are returned as {"error": ...}; don't cache them
+        try:
+            parsed = json.loads(result)
+        except (TypeError, ValueError):
+            parsed = None
+        if not (isinstance(parsed, dict) and "error" in parsed):
+            cache.put("smartscraper", result, prompt, url)
+        return result
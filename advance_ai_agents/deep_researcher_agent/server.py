@@ -1,13 +1,17 @@
 import asyncio
-from mcp.server.fastmcp import FastMCP
-from agents import run_research
+import time
+from mcp.server.fastmcp import Context, FastMCP
+from agents import stream_research
 
 # Create FastMCP instance
 mcp = FastMCP("deep_researcher_agent")
 
+# Minimum seconds between partial-report progress notifications
+PROGRESS_INTERVAL = 0.5
+
 
 @mcp.tool()
-def deep_researcher_agent(query: str) -> str:
+async def deep_researcher_agent(query: str, ctx: Context) -> str:
     """Run Deep Researcher Agent for given user query. Can do both standard and deep web search.
 
     Args:
@@ -16,8 +20,32 @@ def deep_researcher_agent(query: str) -> str:
     Returns:
         str: The research response from the Deep Researcher Agent.
     """
-    
-    return run_research(query)
+    # The workflow is synchronous; advance it in a worker thread so the event loop can
+    # send stage updates and partial report text as progress notifications meanwhile.
+    events = stream_research(query)
+    parts = []
+    pending = []
+    last_sent = 0.0
+    step = 0
+    while True:
+        event = await asyncio.to_thread(next, events, None)
+        if event is None:
+            break
+        stage, content = event
+        step += 1
+        if stage != "report":
+            await ctx.report_progress(step, message=content)
+            continue
+        parts.append(content)
+        pending.append(content)
+        if time.monotonic() - last_sent >= PROGRESS_INTERVAL:
+            await ctx.report_progress(step, message="".join(pending))
+            pending.clear()
+            last_sent = time.monotonic()
+    if pending:
+        await ctx.report_progress(step, message="".join(pending))
+
+    return "".join(parts)
 
 
 # Run the server
@@ -1,6 +1,7 @@
 from fastapi import FastAPI, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from utils.redisCache import lifespan, get_cache
+from utils.metrics import metrics_middleware
 from routes.stockRoutes import router as stock_router
 from routes.agentRoutes import router as agent_router
 
@@ -13,5 +14,7 @@ app.add_middleware(
     allow_headers=["*"],  
 )
 
+app.middleware("http")(metrics_middleware)
+
 app.include_router(stock_router)
 app.include_router(agent_router)
\ No newline at end of file
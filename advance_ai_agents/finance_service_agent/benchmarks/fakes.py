@@ -0,0 +1,103 @@
+"""
+In-process stand-ins for the upstream services used by the app (yfinance, finnhub,
+the agno/Nebius agents and Redis), so the API can be benchmarked without network access.
+"""
+import json
+import random
+import time
+
+import pandas as pd
+
+UPSTREAM_LATENCY = {"yfinance": 0.0, "finnhub": 0.0, "nebius": 0.0}
+
+
+def _wait(upstream):
+    delay = UPSTREAM_LATENCY[upstream]
+    if delay:
+        time.sleep(delay)
+
+
+def _info(symbol):
+    price = round(random.uniform(20, 500), 2)
+    return {
+        "shortName": f"{symbol} Corp",
+        "currentPrice": price,
+        "previousClose": round(price * random.uniform(0.95, 1.05), 2),
+        "sector": "Technology",
+    }
+
+
+class FakeTicker:
+    def __init__(self, symbol):
+        self.symbol = symbol
+
+    @property
+    def info(self):
+        _wait("yfinance")
+        return _info(self.symbol)
+
+
+class FakeTickers:
+    def __init__(self, symbols):
+        self.tickers = {symbol: FakeTicker(symbol) for symbol in symbols}
+
+
+class FakeYFinance:
+    """Replaces the `yf` module imported by controllers.topStocks."""
+    Ticker = FakeTicker
+    Tickers = FakeTickers
+
+    @staticmethod
+    def download(tickers, period="2d", interval="1d", group_by="ticker", auto_adjust=True):
+        _wait("yfinance")
+        frames = {
+            (ticker, "Close"): [random.uniform(20, 500), random.uniform(20, 500)]
+            for ticker in tickers
+        }
+        return pd.DataFrame(frames)
+
+
+class FakeFinnhubClient:
+    def __init__(self, api_key=None):
+        self.api_key = api_key
+
+    def general_news(self, category, min_id=0):
+        _wait("finnhub")
+        return [
+            {"headline": f"Market headline {i}", "url": f"https://news.example.com/{i}"}
+            for i in range(20)
+        ]
+
+
+class FakeFinnhub:
+    """Replaces the `finnhub` module imported by controllers.stockNews."""
+    Client = FakeFinnhubClient
+
+
+class FakeRunResponse:
+    def __init__(self, content):
+        self.content = content
+
+
+class FakeAgent:
+    """Mimics agno's Agent.run for the chat, multi-agent and stock analysis agents."""
+
+    def __init__(self, answer):
+        self.answer = answer
+
+    def run(self, prompt):
+        _wait("nebius")
+        return FakeRunResponse(self.answer(prompt) if callable(self.answer) else self.answer)
+
+
+def fake_analysis(prompt):
+    symbol = prompt.split()[3]
+    return "```json\n" + json.dumps({
+        "symbol": symbol,
+        "company_name": f"{symbol} Corp",
+        "current_price": 123.45,
+        "market_cap": 1_000_000_000,
+        "financial_ratios": {"pe_ratio": 21.3, "roe": 18.2},
+        "financial_health": {"debt_to_equity": 0.8},
+        "per_share_metrics": {"eps": 5.1},
+    }) + "\n```"
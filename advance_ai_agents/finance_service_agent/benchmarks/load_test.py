@@ -0,0 +1,215 @@
+"""
+Load test for the FastAPI app with all upstreams stubbed out.
+
+Run from the project root:
+
+    python -m benchmarks.load_test --requests 2000 --concurrency 32
+    python -m benchmarks.load_test --output results.json
+    python -m benchmarks.load_test --baseline results.json --tolerance 0.25
+    python -m benchmarks.load_test --upstream-latency-ms 5 --repeat 5 --output benchmarks/baseline.json
+
+With --baseline the process exits non-zero if any route's p95 regressed by more
+than the tolerance, which makes it usable as a CI gate. --repeat runs the workload
+several times and keeps each route's slowest percentiles, which is how the
+committed baseline is recorded.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from unittest import mock
+from urllib.parse import quote
+
+import fakeredis
+import httpx
+
+# The controllers refuse to import without API keys
+os.environ.setdefault("NEBIUS_API_KEY", "benchmark")
+os.environ.setdefault("NEWS_API_KEY", "benchmark")
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+
+from benchmarks import fakes
+
+SYMBOLS = ["AAPL", "MSFT", "GOOGL", "AMZN", "NVDA", "TSLA", "META", "JPM", "V", "NFLX",
+           "DIS", "KO", "INTC", "ORCL", "AMD", "IBM", "WMT", "BA", "PEP", "XOM"]
+
+QUESTIONS = ["What are good tech stocks to invest in?", "Should I invest in index funds?",
+             "How should I diversify a retirement portfolio?", "Is now a good time to buy bonds?"]
+
+# (route label, weight, path factory); quotes dominate real traffic
+TRAFFIC_MIX = [
+    ("/stock/{symbol}", 55, lambda: f"/stock/{random.choice(SYMBOLS)}"),
+    ("/top-stocks", 12, lambda: "/top-stocks"),
+    ("/stock-news", 12, lambda: "/stock-news"),
+    ("/stock-analysis/{symbol}", 9, lambda: f"/stock-analysis/{random.choice(SYMBOLS)}"),
+    ("/chat", 6, lambda: f"/chat?query={quote(random.choice(QUESTIONS))}"),
+    ("/agent", 6, lambda: f"/agent?query={quote(random.choice(QUESTIONS))}"),
+]
+
+
+def patch_upstreams():
+    """Swap every upstream client for its in-process fake."""
+    import controllers.topStocks
+    import controllers.stockNews
+    import routes.agentRoutes
+    import routes.stockRoutes
+    import utils.redisCache
+
+    return [
+        mock.patch.object(controllers.topStocks, "yf", fakes.FakeYFinance),
+        mock.patch.object(controllers.stockNews, "finnhub", fakes.FakeFinnhub),
+        mock.patch.object(routes.stockRoutes, "stock_analyzer_agent", fakes.FakeAgent(fakes.fake_analysis)),
+        mock.patch.object(routes.agentRoutes, "chat_agent", fakes.FakeAgent("Diversify.")),
+        mock.patch.object(routes.agentRoutes, "multi_ai", fakes.FakeAgent("Index funds are fine.")),
+        mock.patch.object(utils.redisCache.aioredis, "from_url", lambda *args, **kwargs: fakeredis.FakeAsyncRedis()),
+        mock.patch.object(utils.redisCache, "fetch_egress_ip", lambda: "127.0.0.1"),
+    ]
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def drive(app, total_requests, concurrency, accept):
+    routes, weights, paths = zip(*TRAFFIC_MIX)
+    plan = random.choices(range(len(TRAFFIC_MIX)), weights=weights, k=total_requests)
+    queue = asyncio.Queue()
+    for item in plan:
+        queue.put_nowait(item)
+
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+
+    async def worker(client):
+        while True:
+            try:
+                index = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            start = time.perf_counter()
+            response = await client.get(paths[index](), headers={"accept": accept})
+            latencies[routes[index]].append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors[routes[index]] += 1
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            start = time.perf_counter()
+            await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+            elapsed = time.perf_counter() - start
+
+    return latencies, errors, elapsed
+
+
+def summarize(latencies, errors, elapsed):
+    report = {"elapsed_s": round(elapsed, 3), "routes": {}}
+    total = 0
+    for route, samples in sorted(latencies.items()):
+        total += len(samples)
+        report["routes"][route] = {
+            "requests": len(samples),
+            "errors": errors[route],
+            "rps": round(len(samples) / elapsed, 1),
+            "p50_ms": round(percentile(samples, 50) * 1000, 2),
+            "p95_ms": round(percentile(samples, 95) * 1000, 2),
+            "p99_ms": round(percentile(samples, 99) * 1000, 2),
+        }
+    report["total_requests"] = total
+    report["throughput_rps"] = round(total / elapsed, 1)
+    return report
+
+
+def merge_reports(reports):
+    """Combine repeated runs, keeping each route's slowest percentiles."""
+    merged = {"elapsed_s": round(sum(r["elapsed_s"] for r in reports), 3), "routes": {}, "runs": len(reports)}
+    for report in reports:
+        for route, stats in report["routes"].items():
+            current = merged["routes"].setdefault(route, dict(stats, requests=0, errors=0))
+            current["requests"] += stats["requests"]
+            current["errors"] += stats["errors"]
+            current["rps"] = min(current["rps"], stats["rps"])
+            for key in ("p50_ms", "p95_ms", "p99_ms"):
+                current[key] = max(current[key], stats[key])
+    merged["total_requests"] = sum(r["total_requests"] for r in reports)
+    merged["throughput_rps"] = min(r["throughput_rps"] for r in reports)
+    return merged
+
+
+def print_report(report):
+    print(f"{'route':<28}{'reqs':>7}{'errs':>6}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for route, stats in report["routes"].items():
+        print(f"{route:<28}{stats['requests']:>7}{stats['errors']:>6}{stats['rps']:>9}"
+              f"{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}")
+    print(f"\n{report['total_requests']} requests in {report['elapsed_s']}s "
+          f"({report['throughput_rps']} req/s)")
+
+
+def find_regressions(report, baseline, tolerance):
+    regressions = []
+    for route, stats in report["routes"].items():
+        previous = baseline.get("routes", {}).get(route)
+        if previous and stats["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{route}: p95 {previous['p95_ms']}ms -> {stats['p95_ms']}ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the API with stubbed upstreams")
+    parser.add_argument("--requests", type=int, default=2000, help="Total number of requests")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent clients")
+    parser.add_argument("--html", action="store_true", help="Request the HTML pages instead of JSON")
+    parser.add_argument("--upstream-latency-ms", type=float, default=0.0,
+                        help="Simulated latency of each yfinance/finnhub/Nebius call")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="Run the workload this many times and report the slowest percentiles per route")
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    parser.add_argument("--baseline", help="Fail if p95 regressed against this JSON report")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed p95 regression (fraction)")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    for upstream in fakes.UPSTREAM_LATENCY:
+        fakes.UPSTREAM_LATENCY[upstream] = args.upstream_latency_ms / 1000
+
+    patches = patch_upstreams()
+    for patch in patches:
+        patch.start()
+    try:
+        from app import app
+        accept = "text/html" if args.html else "application/json"
+        reports = [
+            summarize(*asyncio.run(drive(app, args.requests, args.concurrency, accept)))
+            for _ in range(max(1, args.repeat))
+        ]
+    finally:
+        for patch in patches:
+            patch.stop()
+
+    report = reports[0] if len(reports) == 1 else merge_reports(reports)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = find_regressions(report, json.load(f), args.tolerance)
+        if regressions:
+            print("\n❌ Latency regressions detected:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("\n✅ No latency regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
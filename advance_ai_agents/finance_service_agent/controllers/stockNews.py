@@ -3,6 +3,7 @@ import time
 import requests
 import dotenv 
 import os
+from utils.metrics import track_upstream
 
 dotenv.load_dotenv()
 
@@ -20,7 +21,8 @@ def fetch_news():
 
         finnhub_client = finnhub.Client(api_key=NEWS_API_KEY)
 
-        news_list =finnhub_client.general_news('general', min_id=4)
+        with track_upstream("finnhub"):
+            news_list =finnhub_client.general_news('general', min_id=4)
         news_stack=[]
         for news in news_list[:10]:
             news_stack.append([news['headline'],news['url']])
@@ -1,6 +1,7 @@
 import yfinance as yf
 import requests 
 import time
+from utils.metrics import track_upstream
 session = requests.Session()
 session.headers.update({
     "User-Agent": "Chrome/122.0.0.0"
@@ -15,7 +16,8 @@ def get_top_stock_info():
     ]
     stock_data = []
     try:
-        data = yf.download(tickers_list, period="2d", interval="1d", group_by='ticker', auto_adjust=True)
+        with track_upstream("yfinance"):
+            data = yf.download(tickers_list, period="2d", interval="1d", group_by='ticker', auto_adjust=True)
         changes = []
 
         for ticker in tickers_list:
@@ -32,7 +34,8 @@ def get_top_stock_info():
         while top_5_tickers:
             try:
                 stock = top_5_tickers.pop()
-                info = tickers.tickers[stock].info
+                with track_upstream("yfinance"):
+                    info = tickers.tickers[stock].info
                 stock_info = {
                     'symbol': stock,
                     'name': info.get('shortName', 'N/A'),
@@ -54,7 +57,8 @@ def get_top_stock_info():
 def get_stock(symbol):
     try:
         stock = yf.Ticker(symbol)
-        info = stock.info
+        with track_upstream("yfinance"):
+            info = stock.info
         stock_info = {
                 'symbol': symbol,
                 'name': info.get('shortName', 'N/A'),
@@ -1,62 +1,83 @@
 import os
+import asyncio
 import datetime
-import json
-import requests
-from fastapi import FastAPI, APIRouter, Request, Query
-from fastapi.responses import HTMLResponse, JSONResponse
-from fastapi.templating import Jinja2Templates
-from agno.agent import RunResponse, Agent
-from agno.models.nebius import Nebius
+from fastapi import APIRouter, Request
+from fastapi.responses import HTMLResponse, Response
+from agno.agent import RunResponse
 from controllers.agents import multi_ai
 import dotenv
 from controllers.ask import chat_agent
+from utils.metrics import track_upstream, render_metrics
+from utils.responses import RouteDoc, param, dumps, wants_html, render, render_data
 
 router = APIRouter()
 
 dotenv.load_dotenv()
 NEBIUS_API_KEY = os.getenv("NEBIUS_API_KEY")
-templates = Jinja2Templates(directory="templates")
+
+HEALTH_DOC = RouteDoc(
+    route_path="/health",
+    description="Health check endpoint to verify the API server status and connections.",
+    parameters=(param("format", "string", "Response format (html or json)"),),
+)
+CHAT_DOC = RouteDoc(
+    route_path="/chat",
+    description="Chat endpoint that uses Nebius's LLaMa model to answer investment questions.",
+    parameters=(
+        param("query", "string", "The investment question to ask"),
+        param("format", "string", "Response format (html or json)"),
+    ),
+    example_query="What are good tech stocks to invest in?",
+)
+AGENT_DOC = RouteDoc(
+    route_path="/agent",
+    description="Agent endpoint that uses a multi-AI system to provide sophisticated investment advice.",
+    parameters=(
+        param("query", "string", "The investment question to ask"),
+        param("format", "string", "Response format (html or json)"),
+    ),
+    example_query="Should I invest in index funds?",
+)
+
+# Example payloads are static, so serialize them once
+CHAT_EXAMPLE = dumps({
+    "question": "What are good tech stocks to invest in?",
+    "answer": "Some popular tech stocks to consider include Apple (AAPL), Microsoft (MSFT), Google (GOOGL), and Amazon (AMZN). However, you should always do your own research and consider your investment goals and risk tolerance before investing."
+})
+AGENT_EXAMPLE = dumps({
+    "question": "Should I invest in index funds?",
+    "answer": "Index funds are often a good choice for passive investors looking for broad market exposure with low fees. They offer diversification and typically outperform actively managed funds in the long term. However, the suitability depends on your investment goals, time horizon, and risk tolerance."
+})
+
+async def ping_redis(redis_client):
+    if redis_client is None:
+        return "not configured"
+    try:
+        await asyncio.wait_for(redis_client.ping(), timeout=1)
+        return "connected"
+    except Exception as e:
+        return f"unreachable: {e}"
 
 @router.get("/health", response_class=HTMLResponse)
 async def health_check(request: Request):
     """Health check endpoint to verify the API server status and connections."""
     try:
+        redis_status = await ping_redis(request.app.state.redis)
         response_data = {
-            "status": "healthy",
+            "status": "healthy" if redis_status == "connected" else "degraded",
             "timestamp": datetime.datetime.now().isoformat(),
             "uptime": "OK",
             "api": {
                 "nebius_api": "connected" if NEBIUS_API_KEY else "not configured",
+                "redis": redis_status,
             },
-            "ip": requests.get('https://api.ipify.org').text,
+            "ip": request.app.state.egress_ip,
             "services": {
                 "chat": router.url_path_for("chat"),
                 "agent": router.url_path_for("ask"),
             },
         }
-
-        # Check if request is from a browser or format is explicitly set to html
-        accept_header = request.headers.get("accept", "")
-        if "text/html" in accept_header:
-            current_year = datetime.datetime.now().year
-            return templates.TemplateResponse(
-                "route.html",
-                {
-                    "request": request,
-                    "route_path": "/health",
-                    "method": "GET",
-                    "full_path": str(request.url).split("?")[0],
-                    "description": "Health check endpoint to verify the API server status and connections.",
-                    "parameters": [
-                        {"name": "format", "type": "string", "description": "Response format (html or json)"}
-                    ],
-                    "example_query": "",
-                    "example_response": json.dumps(response_data, indent=2),
-                    "current_year": current_year
-                }
-            )
-        
-        return JSONResponse(content=response_data)
+        return render_data(request, HEALTH_DOC, response_data)
 
     except Exception as e:
         error_response = {
@@ -64,115 +85,52 @@ async def health_check(request: Request):
             "timestamp": datetime.datetime.now().isoformat(),
             "error": str(e)
         }
-        
-        # Check if request is from a browser or format is explicitly set to html
-        accept_header = request.headers.get("accept", "")
-        if "text/html" in accept_header:
-            current_year = datetime.datetime.now().year
-            return templates.TemplateResponse(
-                "route.html",
-                {
-                    "request": request,
-                    "route_path": "/health",
-                    "method": "GET",
-                    "full_path": str(request.url).split("?")[0],
-                    "description": "Health check endpoint to verify the API server status and connections.",
-                    "parameters": [
-                        {"name": "format", "type": "string", "description": "Response format (html or json)"}
-                    ],
-                    "example_query": "",
-                    "example_response": json.dumps(error_response, indent=2),
-                    "current_year": current_year
-                }
-            )
-            
-        return JSONResponse(content=error_response)
+        return render_data(request, HEALTH_DOC, error_response)
+
+@router.get("/metrics")
+async def metrics():
+    """Prometheus metrics: per-route latency, cache hit ratio and upstream call durations."""
+    content, media_type = render_metrics()
+    return Response(content=content, media_type=media_type)
 
 @router.get("/chat", response_class=HTMLResponse)
 def chat(request: Request, query: str = None):
     """
     API endpoint to handle user investment-related questions and return AI-generated insights.
     """
-    # Check if request is from a browser or format is explicitly set to html
-    accept_header = request.headers.get("accept", "")
-    if "text/html" in accept_header:
-        current_year = datetime.datetime.now().year
-        example_response = {
-            "question": "What are good tech stocks to invest in?",
-            "answer": "Some popular tech stocks to consider include Apple (AAPL), Microsoft (MSFT), Google (GOOGL), and Amazon (AMZN). However, you should always do your own research and consider your investment goals and risk tolerance before investing."
-        }
-        
-        return templates.TemplateResponse(
-            "route.html",
-            {
-                "request": request,
-                "route_path": "/chat",
-                "method": "GET",
-                "full_path": str(request.url).split("?")[0],
-                "description": "Chat endpoint that uses Nebius's LLaMa model to answer investment questions.",
-                "parameters": [
-                    {"name": "query", "type": "string", "description": "The investment question to ask"},
-                    {"name": "format", "type": "string", "description": "Response format (html or json)"}
-                ],
-                "example_query": "What are good tech stocks to invest in?",
-                "example_response": json.dumps(example_response, indent=2),
-                "current_year": current_year
-            }
-        )
-    
+    if wants_html(request):
+        return render(request, CHAT_DOC, CHAT_EXAMPLE)
+
     # Handle regular API calls
     if not query:
-        return JSONResponse(content={"error": "Query parameter is required"})
-    
+        return render_data(request, CHAT_DOC, {"error": "Query parameter is required"})
+
     try:
-        response = chat_agent.run(query)
+        with track_upstream("nebius"):
+            response = chat_agent.run(query)
         answer = response.content
-        return JSONResponse(content={"question": query, "answer": answer})
-    
+        return render_data(request, CHAT_DOC, {"question": query, "answer": answer})
+
     except Exception as e:
-        return JSONResponse(content={"error": str(e)})
+        return render_data(request, CHAT_DOC, {"error": str(e)})
 
 @router.get("/agent", response_class=HTMLResponse)
 def ask(request: Request, query: str = None):
     """
     API endpoint to handle user investment-related questions and return AI-generated insights.
     """
-    # Check if request is from a browser or format is explicitly set to html
-    accept_header = request.headers.get("accept", "")
-    if "text/html" in accept_header:
-        current_year = datetime.datetime.now().year
-        example_response = {
-            "question": "Should I invest in index funds?",
-            "answer": "Index funds are often a good choice for passive investors looking for broad market exposure with low fees. They offer diversification and typically outperform actively managed funds in the long term. However, the suitability depends on your investment goals, time horizon, and risk tolerance."
-        }
-        
-        return templates.TemplateResponse(
-            "route.html",
-            {
-                "request": request,
-                "route_path": "/agent",
-                "method": "GET",
-                "full_path": str(request.url).split("?")[0],
-                "description": "Agent endpoint that uses a multi-AI system to provide sophisticated investment advice.",
-                "parameters": [
-                    {"name": "query", "type": "string", "description": "The investment question to ask"},
-                    {"name": "format", "type": "string", "description": "Response format (html or json)"}
-                ],
-                "example_query": "Should I invest in index funds?",
-                "example_response": json.dumps(example_response, indent=2),
-                "current_year": current_year
-            }
-        )
-    
+    if wants_html(request):
+        return render(request, AGENT_DOC, AGENT_EXAMPLE)
+
     # Handle regular API calls
     if not query:
-        return JSONResponse(content={"error": "Query parameter is required"})
-    
+        return render_data(request, AGENT_DOC, {"error": "Query parameter is required"})
+
     try:
-        response: RunResponse = multi_ai.run(query)
+        with track_upstream("nebius"):
+            response: RunResponse = multi_ai.run(query)
         answer = response.content
+        return render_data(request, AGENT_DOC, {"question": query, "answer": answer})
 
-        return JSONResponse(content={"question": query, "answer": answer})
-    
     except Exception as e:
-        return JSONResponse(content={"error": str(e)})
+        return render_data(request, AGENT_DOC, {"error": str(e)})
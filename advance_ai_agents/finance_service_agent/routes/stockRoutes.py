@@ -1,21 +1,33 @@
 from fastapi import APIRouter, Depends, Request
-from fastapi_cache import FastAPICache
 from fastapi_cache.backends.redis import RedisBackend
 from utils.redisCache import get_cache
+from utils.metrics import track_upstream
+from utils.responses import RouteDoc, param, templates, render, render_data, cached_payload
 from controllers.topStocks import get_stock, get_top_stock_info
 from controllers.stockNews import fetch_news
 from controllers.stockAgent import stock_analyzer_agent, extract_json_from_response, create_default_stock_data, merge_stock_data
-from fastapi.responses import JSONResponse, HTMLResponse
-from fastapi import FastAPI, Query, HTTPException
-import os
-import re
-import json
-from fastapi.templating import Jinja2Templates
-import datetime
 
-templates = Jinja2Templates(directory="templates")
 router = APIRouter()
 
+TOP_STOCKS_DOC = RouteDoc(
+    route_path="/top-stocks",
+    description="Returns information about top stocks in the market",
+)
+STOCK_NEWS_DOC = RouteDoc(
+    route_path="/stock-news",
+    description="Returns latest news articles related to stocks and financial markets",
+)
+STOCK_DOC = RouteDoc(
+    route_path="/stock/{symbol}",
+    description="Returns detailed information about a specific stock",
+    parameters=(param("symbol", "string", "Stock symbol (e.g., AAPL, MSFT)"),),
+)
+STOCK_ANALYSIS_DOC = RouteDoc(
+    route_path="/stock-analysis/{symbol}",
+    description="Provides detailed AI-powered analysis of a stock, including financial metrics and predictions",
+    parameters=(param("symbol", "string", "Stock symbol to analyze (e.g., AAPL, MSFT)"),),
+)
+
 @router.get("/")
 @router.head("/")
 async def read_root(request: Request):
@@ -25,157 +37,49 @@ async def read_root(request: Request):
 
 @router.get("/top-stocks")
 async def read_top_stocks(request: Request, cache: RedisBackend = Depends(get_cache)):
-    cache_key = "top_stocks"
-    cached_result = await cache.get(cache_key)
-    
-    if cached_result:
-        result = json.loads(cached_result)
-    else:
-        result = get_top_stock_info()
-        await cache.set(cache_key, json.dumps(result), 10)
-    
-    # Check if request is from a browser
-    accept_header = request.headers.get("accept", "")
-    if "text/html" in accept_header:
-        return templates.TemplateResponse("route.html", {
-            "request": request,
-            "route_path": "/top-stocks",
-            "method": "GET",
-            "full_path": request.url.scheme + "://" + request.url.netloc + "/top-stocks",
-            "description": "Returns information about top stocks in the market",
-            "parameters": [],
-            "example_response": json.dumps(result, indent=2),
-            "current_year": datetime.datetime.now().year
-        })
-    
-    return result
+    payload = await cached_payload(cache, "top_stocks", 10, get_top_stock_info)
+    return render(request, TOP_STOCKS_DOC, payload)
 
 @router.get("/stock-news")
 async def stock_news(request: Request, cache: RedisBackend = Depends(get_cache)):
-    cache_key = "stock_news"
-    cached_result = await cache.get(cache_key)
-    
-    if cached_result:
-        result = json.loads(cached_result)
-    else:
-        result = fetch_news()
-        await cache.set(cache_key, json.dumps(result), 300)
-    
-    # Check if request is from a browser
-    accept_header = request.headers.get("accept", "")
-    if "text/html" in accept_header:
-        return templates.TemplateResponse("route.html", {
-            "request": request,
-            "route_path": "/stock-news",
-            "method": "GET",
-            "full_path": request.url.scheme + "://" + request.url.netloc + "/stock-news",
-            "description": "Returns latest news articles related to stocks and financial markets",
-            "parameters": [],
-            "example_response": json.dumps(result[:2], indent=2),  # Showing only first 2 news items as example
-            "current_year": datetime.datetime.now().year
-        })
-    
-    return result
+    payload = await cached_payload(cache, "stock_news", 300, fetch_news)
+    # Showing only first 2 news items as example
+    return render(request, STOCK_NEWS_DOC, payload, example_slice=2)
 
 @router.get("/stock/{symbol}")
 async def read_stock(request: Request, symbol: str, cache: RedisBackend = Depends(get_cache)):
-    # Use f-string to properly interpolate the symbol variable
-    cache_key = f"stock_{symbol}"
-    cached_result = await cache.get(cache_key)
-    
-    if cached_result:
-        result = json.loads(cached_result)
-    else:
-        result = get_stock(symbol)
-        await cache.set(cache_key, json.dumps(result), 10)
-    
-    # Check if request is from a browser
-    accept_header = request.headers.get("accept", "")
-    if "text/html" in accept_header:
-        return templates.TemplateResponse("route.html", {
-            "request": request,
-            "route_path": f"/stock/{{{symbol}}}",
-            "method": "GET",
-            "full_path": request.url.scheme + "://" + request.url.netloc + f"/stock/{symbol}",
-            "description": "Returns detailed information about a specific stock",
-            "parameters": [
-                {"name": "symbol", "type": "string", "description": "Stock symbol (e.g., AAPL, MSFT)"}
-            ],
-            "example_response": json.dumps(result, indent=2),
-            "current_year": datetime.datetime.now().year
-        })
-    
-    return result
+    payload = await cached_payload(cache, f"stock_{symbol}", 10, lambda: get_stock(symbol), metric_key="stock")
+    return render(request, STOCK_DOC, payload)
+
+def analyze_stock(symbol: str):
+    # Construct a clear prompt for the model
+    prompt = f"Analyze the stock {symbol} and provide detailed financial information following the specified JSON format."
+    with track_upstream("nebius"):
+        response = stock_analyzer_agent.run(prompt)
+
+    # Extract JSON from the response
+    if hasattr(response, 'content'):
+        # Try to extract JSON from the content
+        json_data = extract_json_from_response(response.content)
+
+        if json_data:
+            # Create default data and merge with extracted data
+            default_data = create_default_stock_data(symbol)
+            return merge_stock_data(default_data, json_data)
+
+    return create_default_stock_data(symbol)
 
 @router.get("/stock-analysis/{symbol}")
 async def get_stock_analysis(request: Request, symbol: str, cache: RedisBackend = Depends(get_cache)):
-    cache_key = f"stock_analysis_{symbol}"
     """
     Get detailed stock analysis for a given stock symbol.
     Returns a JSON response with financial metrics.
     """
     try:
-        # Get or compute result
-        cached_result = await cache.get(cache_key)
-        if cached_result:
-            result = json.loads(cached_result)
-        else:
-            # Construct a clear prompt for the model
-            prompt = f"Analyze the stock {symbol} and provide detailed financial information following the specified JSON format."
-            response = stock_analyzer_agent.run(prompt)
-            
-            # Extract JSON from the response
-            if hasattr(response, 'content'):
-                # Try to extract JSON from the content
-                json_data = extract_json_from_response(response.content)
-                
-                if json_data:                
-                    # Create default data and merge with extracted data
-                    default_data = create_default_stock_data(symbol)
-                    result = merge_stock_data(default_data, json_data)
-                else:
-                    result = create_default_stock_data(symbol)
-            else:
-                result = create_default_stock_data(symbol)
-                
-            await cache.set(cache_key, json.dumps(result), 300)
-        
-        # Check if request is from a browser
-        accept_header = request.headers.get("accept", "")
-        if "text/html" in accept_header:
-            return templates.TemplateResponse("route.html", {
-                "request": request,
-                "route_path": f"/stock-analysis/{{{symbol}}}",
-                "method": "GET",
-                "full_path": request.url.scheme + "://" + request.url.netloc + f"/stock-analysis/{symbol}",
-                "description": "Provides detailed AI-powered analysis of a stock, including financial metrics and predictions",
-                "parameters": [
-                    {"name": "symbol", "type": "string", "description": "Stock symbol to analyze (e.g., AAPL, MSFT)"}
-                ],
-                "example_response": json.dumps(result, indent=2),
-                "current_year": datetime.datetime.now().year
-            })
-        
-        return JSONResponse(content=result)
-        
+        payload = await cached_payload(cache, f"stock_analysis_{symbol}", 300, lambda: analyze_stock(symbol),
+                                       metric_key="stock_analysis")
+        return render(request, STOCK_ANALYSIS_DOC, payload)
+
     except Exception as e:
         error_response = {"error": f"Failed to retrieve stock data: {str(e)}"}
-        
-        # Check if request is from a browser for error case
-        accept_header = request.headers.get("accept", "")
-        if "text/html" in accept_header:
-            return templates.TemplateResponse("route.html", {
-                "request": request,
-                "route_path": f"/stock-analysis/{{{symbol}}}",
-                "method": "GET",
-                "full_path": request.url.scheme + "://" + request.url.netloc + f"/stock-analysis/{symbol}",
-                "description": "Provides detailed AI-powered analysis of a stock, including financial metrics and predictions",
-                "parameters": [
-                    {"name": "symbol", "type": "string", "description": "Stock symbol to analyze (e.g., AAPL, MSFT)"}
-                ],
-                "example_response": json.dumps(error_response, indent=2),
-                "current_year": datetime.datetime.now().year
-            })
-            
-        return JSONResponse(status_code=500, content=error_response)
-
+        return render_data(request, STOCK_ANALYSIS_DOC, error_response, status_code=500)
@@ -0,0 +1,68 @@
+from contextlib import contextmanager
+import time
+
+from fastapi import Request
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Request latency per route",
+    ["method", "route", "status"],
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Redis cache lookups by key prefix and result",
+    ["key", "result"],
+)
+CACHE_HIT_RATIO = Gauge(
+    "cache_hit_ratio",
+    "Share of Redis cache lookups that were hits since startup",
+)
+UPSTREAM_LATENCY = Histogram(
+    "upstream_call_duration_seconds",
+    "Duration of calls to upstream services (yfinance, finnhub, nebius)",
+    ["upstream", "outcome"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+
+_cache_totals = {"hit": 0, "miss": 0}
+
+
+def record_cache(key: str, hit: bool):
+    """Count a cache lookup; key is the cache key family (e.g. "stock"), not the full per-symbol key."""
+    result = "hit" if hit else "miss"
+    CACHE_REQUESTS.labels(key=key, result=result).inc()
+    _cache_totals[result] += 1
+    CACHE_HIT_RATIO.set(_cache_totals["hit"] / (_cache_totals["hit"] + _cache_totals["miss"]))
+
+
+@contextmanager
+def track_upstream(upstream: str):
+    """Time a call to an upstream service."""
+    start = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield
+    except Exception:
+        outcome = "error"
+        raise
+    finally:
+        UPSTREAM_LATENCY.labels(upstream=upstream, outcome=outcome).observe(time.perf_counter() - start)
+
+
+async def metrics_middleware(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Use the route template (e.g. /stock/{symbol}) rather than the raw path
+        route = request.scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        REQUEST_LATENCY.labels(method=request.method, route=path, status=str(status)).observe(time.perf_counter() - start)
+
+
+def render_metrics():
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -3,20 +3,33 @@ from contextlib import asynccontextmanager
 from redis import asyncio as aioredis
 from fastapi_cache import FastAPICache
 from fastapi import FastAPI
+import asyncio
 import os
 import dotenv
+import requests
 
 dotenv.load_dotenv()
 
 REDIS_URL = os.getenv("REDIS_URL")
 
+def fetch_egress_ip():
+    try:
+        return requests.get('https://api.ipify.org', timeout=5).text
+    except Exception as e:
+        print(f"❌ Could not resolve egress IP: {e}")
+        return None
+
 @asynccontextmanager
-async def lifespan(_: FastAPI):
+async def lifespan(app: FastAPI):
     redis_client = None  
+    app.state.redis = None
+    # Resolve the egress IP once so /health never makes outbound calls
+    app.state.egress_ip = await asyncio.to_thread(fetch_egress_ip)
 
     try:
-        redis_client = aioredis.from_url(REDIS_URL, encoding="utf-8", decode_responses=True)
+        redis_client = aioredis.from_url(REDIS_URL)
         FastAPICache.init(RedisBackend(redis_client), prefix="fastapi-cache")
+        app.state.redis = redis_client
         print("✅ Redis cache initialized successfully!")
         yield
         
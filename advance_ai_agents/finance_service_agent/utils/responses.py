@@ -0,0 +1,114 @@
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Optional, Union
+import datetime
+import inspect
+import os
+
+import orjson
+from fastapi import Request
+from fastapi.responses import HTMLResponse, Response
+from fastapi.templating import Jinja2Templates
+from utils.metrics import record_cache
+
+# Resolved from this file so importing the app works from any working directory
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates")
+templates = Jinja2Templates(directory=TEMPLATES_DIR)
+
+# Compile route.html once at import time instead of on every browser request
+ROUTE_TEMPLATE = templates.get_template("route.html")
+
+Payload = Union[bytes, str]
+
+
+@dataclass(frozen=True)
+class RouteDoc:
+    """Static description of a route, used to render the route.html page."""
+    route_path: str
+    description: str
+    parameters: tuple = field(default_factory=tuple)
+    example_query: str = ""
+    method: str = "GET"
+
+
+def param(name: str, type_: str, description: str) -> tuple:
+    """Build a hashable route parameter entry for RouteDoc.parameters."""
+    return (("name", name), ("type", type_), ("description", description))
+
+
+def wants_html(request: Request) -> bool:
+    """Check if request is from a browser."""
+    return "text/html" in request.headers.get("accept", "")
+
+
+def dumps(data) -> bytes:
+    """Serialize a result with orjson (used on cache misses)."""
+    return orjson.dumps(data)
+
+
+def full_path(request: Request) -> str:
+    return str(request.url).split("?")[0]
+
+
+def _render_route_html(doc: RouteDoc, path: str, data, year: int) -> str:
+    return ROUTE_TEMPLATE.render(
+        route_path=doc.route_path,
+        method=doc.method,
+        full_path=path,
+        description=doc.description,
+        parameters=[dict(p) for p in doc.parameters],
+        example_query=doc.example_query,
+        example_response=orjson.dumps(data, option=orjson.OPT_INDENT_2).decode(),
+        current_year=year,
+    )
+
+
+@lru_cache(maxsize=512)
+def _render_cached_html(doc: RouteDoc, path: str, payload: bytes, example_slice: Optional[int], year: int) -> str:
+    data = orjson.loads(payload)
+    if example_slice is not None and isinstance(data, list):
+        data = data[:example_slice]
+    return _render_route_html(doc, path, data, year)
+
+
+def render(request: Request, doc: RouteDoc, payload: Payload, status_code: int = 200,
+           example_slice: Optional[int] = None) -> Response:
+    """
+    Return a cached JSON payload to API clients as-is, or the route.html page to browsers.
+    The HTML page is rendered once per (route, payload) and memoized afterwards.
+    """
+    if isinstance(payload, str):
+        payload = payload.encode()
+
+    if wants_html(request):
+        html = _render_cached_html(doc, full_path(request), payload, example_slice, datetime.datetime.now().year)
+        return HTMLResponse(content=html, status_code=status_code)
+
+    return Response(content=payload, status_code=status_code, media_type="application/json")
+
+
+def render_data(request: Request, doc: RouteDoc, data, status_code: int = 200) -> Response:
+    """Render a one-off (uncached) result for the requesting client."""
+    if wants_html(request):
+        html = _render_route_html(doc, full_path(request), data, datetime.datetime.now().year)
+        return HTMLResponse(content=html, status_code=status_code)
+
+    return Response(content=dumps(data), status_code=status_code, media_type="application/json")
+
+
+async def cached_payload(cache, cache_key: str, expire: int, compute: Callable, metric_key: Optional[str] = None) -> bytes:
+    """
+    Return the serialized result stored under cache_key, computing and caching it on a miss.
+    Cache hits are served as the raw Redis value without a decode/re-encode round trip.
+    """
+    cached_result = await cache.get(cache_key)
+    record_cache(metric_key or cache_key, bool(cached_result))
+    if cached_result:
+        return cached_result if isinstance(cached_result, bytes) else cached_result.encode()
+
+    result = compute()
+    if inspect.isawaitable(result):
+        result = await result
+    payload = dumps(result)
+    await cache.set(cache_key, payload, expire)
+    return payload
@@ -25,15 +25,19 @@ if 'analysis_result' not in st.session_state:
     st.session_state.analysis_result = ""
 if 'is_analyzing' not in st.session_state:
     st.session_state.is_analyzing = False
+if 'stage_timings' not in st.session_state:
+    st.session_state.stage_timings = {}
 
-async def analyze_profile(linkedin_url: str):
+async def analyze_profile(linkedin_url: str, force_refresh: bool = False):
     try:
         if not await wait_for_initialization():
             st.error("Failed to initialize MCP server")
             return
             
-        result = await run_analysis(get_mcp_server(), linkedin_url)
+        timings = {}
+        result = await run_analysis(get_mcp_server(), linkedin_url, force_refresh=force_refresh, timings=timings)
         st.session_state.analysis_result = result
+        st.session_state.stage_timings = timings
     except Exception as e:
         logger.error(f"Error analyzing LinkedIn profile: {str(e)}")
         st.error(f"Error analyzing LinkedIn profile: {str(e)}")
@@ -65,6 +69,7 @@ def main():
         
         st.subheader("Enter LinkedIn Profile URL")
         linkedin_url = st.text_input("LinkedIn URL", placeholder="https://www.linkedin.com/in/username/")
+        force_refresh = st.checkbox("Re-analyze profile (ignore cached analysis)", value=False)
         
         if st.button("Analyze Profile", type="primary", disabled=st.session_state.is_analyzing):
             if not linkedin_url:
@@ -76,11 +81,12 @@ def main():
 
             st.session_state.is_analyzing = True
             st.session_state.analysis_result = ""
+            st.session_state.stage_timings = {}
             
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
             try:
-                loop.run_until_complete(analyze_profile(linkedin_url))
+                loop.run_until_complete(analyze_profile(linkedin_url, force_refresh))
             finally:
                 loop.close()
 
@@ -88,6 +94,8 @@ def main():
     if st.session_state.analysis_result:
         st.subheader("Analysis Results")
         st.markdown(st.session_state.analysis_result)
+        if st.session_state.stage_timings:
+            st.caption(" · ".join(f"{stage}: {seconds:.1f}s" for stage, seconds in st.session_state.stage_timings.items()))
 
     # Loading state
     if st.session_state.is_analyzing:
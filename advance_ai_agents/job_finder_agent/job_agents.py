@@ -1,6 +1,10 @@
 import os
+import re
+import json
+import time
 import logging
 import asyncio
+from typing import Dict, Optional
 from agents import (
     Agent,
     OpenAIChatCompletionsModel,
@@ -9,10 +13,96 @@ from agents import (
 )
 from agents.mcp import MCPServer
 from openai import AsyncOpenAI
+from profile_cache import get_profile_cache
 
 logger = logging.getLogger(__name__)
 
-async def run_analysis(mcp_server: MCPServer, linkedin_url: str):
+# Y Combinator job board per domain returned by the job suggestions agent
+DOMAIN_JOB_URLS = {
+    "Software Engineering": "ycombinator.com/jobs/role/software-engineer",
+    "Design & UI/UX": "ycombinator.com/jobs/role/designer",
+    "Product Management": "ycombinator.com/jobs/role/product-manager",
+    "Recruiting & HR": "ycombinator.com/jobs/role/recruiting-hr",
+    "Sales": "ycombinator.com/jobs/role/sales-manager",
+    "Science": "ycombinator.com/jobs/role/science",
+    "Marketing": "ycombinator.com/jobs/role/marketing",
+}
+DEFAULT_JOB_URL = "ycombinator.com/jobs"
+
+# Apply hrefs carry the job id in a percent-encoded continue= URL (signup_job_id%3D75187)
+_AUTH_URL = re.compile(r"https?://[^\s)\]>]*signup_job_id(?:=|%3D|%253D)(\d+)[^\s)\]>]*", re.IGNORECASE)
+
+# Analyses shorter than this, or opening with one of these phrases, are failed runs and are not cached
+MIN_ANALYSIS_LENGTH = 200
+_FAILED_ANALYSIS = re.compile(
+    r"\b(could not|couldn't|unable to|failed to|cannot|can't|not able to)\b.{0,40}"
+    r"\b(access|retrieve|fetch|scrape|load|find|view|open|analy[sz]e)\b"
+    # A bare "error" can be profile content ("error handling", an SRE headline), so only failure phrases count
+    r"|\berror\s+(accessing|retrieving|fetching|scraping|loading|reading)\b|^\W*error\s*:",
+    re.IGNORECASE,
+)
+
+
+def is_usable_analysis(analysis: str) -> bool:
+    """False for empty output and for runs where the agent could not read the profile."""
+    text = (analysis or "").strip()
+    return len(text) >= MIN_ANALYSIS_LENGTH and not _FAILED_ANALYSIS.search(text[:300])
+
+
+def selected_domain(suggestions: str) -> str:
+    """The domain chosen by the job suggestions agent, or "" if none can be read."""
+    domain = None
+    match = re.search(r"\{.*\}", suggestions, re.DOTALL)
+    if match:
+        try:
+            domain = json.loads(match.group(0)).get("selected_domain")
+        except (ValueError, AttributeError):
+            domain = None
+    if not domain:
+        # Fall back to the first known domain mentioned in a malformed response
+        domain = next((name for name in DOMAIN_JOB_URLS if name.lower() in suggestions.lower()), None)
+    return str(domain or "").strip()
+
+
+def job_board_link(suggestions: str) -> str:
+    """Map the job suggestions JSON to {"job_board_url", "domain"} for the job finder agent."""
+    domain = selected_domain(suggestions)
+    return json.dumps({
+        "job_board_url": DOMAIN_JOB_URLS.get(domain, DEFAULT_JOB_URL),
+        "domain": domain or "Not available",
+    })
+
+
+def direct_job_urls(job_listings: str) -> str:
+    """Replace Y Combinator sign-up URLs with direct workatastartup.com job URLs."""
+    return _AUTH_URL.sub(lambda m: f"https://www.workatastartup.com/jobs/{m.group(1)}", job_listings)
+
+
+async def timed(stage: str, coro, timings: Dict[str, float]):
+    """Await coro and record how long it took under timings[stage]."""
+    start = time.perf_counter()
+    try:
+        return await coro
+    finally:
+        timings[stage] = time.perf_counter() - start
+        logger.info(f"{stage} completed in {timings[stage]:.2f}s")
+
+
+async def run_analysis(
+    mcp_server: MCPServer,
+    linkedin_url: str,
+    force_refresh: bool = False,
+    timings: Optional[Dict[str, float]] = None,
+):
+    """
+    Analyze a LinkedIn profile and match it against Y Combinator jobs.
+
+    The profile analysis, job suggestions and profile report are cached per URL
+    (see profile_cache.py) unless force_refresh is set; failed or empty analyses are
+    never cached. Once the domain is known, the
+    profile report and the job search branch run concurrently. Per-stage durations in
+    seconds are logged and, if given, written into `timings`.
+    """
     logger.info(f"Starting analysis for LinkedIn URL: {linkedin_url}")
     api_key = os.environ["NEBIUS_API_KEY"]
     base_url = "https://api.studio.nebius.ai/v1" 
@@ -75,43 +165,6 @@ async def run_analysis(mcp_server: MCPServer, linkedin_url: str):
         )
     )
 
-    url_generator_agent = Agent(
-        name="URL Generator",
-        instructions=f"""You are a URL generator that creates Y Combinator job board URLs based on domains.
-
-        Input: JSON from job suggestions agent with format:
-        {{
-            "selected_domain": "domain name",
-            "confidence_score": number,
-            "selection_reason": "reason"
-        }}
-
-        Map domains to URLs:
-        - "Software Engineering" -> "ycombinator.com/jobs/role/software-engineer"
-        - "Design & UI/UX" -> "ycombinator.com/jobs/role/designer"
-        - "Product Management" -> "ycombinator.com/jobs/role/product-manager"
-        - "Recruiting & HR" -> "ycombinator.com/jobs/role/recruiting-hr"
-        - "Sales" -> "ycombinator.com/jobs/role/sales-manager"
-        - "Science" -> "ycombinator.com/jobs/role/science"
-        - "Marketing" -> "ycombinator.com/jobs/role/marketing"
-
-        Output format:
-        {{
-            "job_board_url": "mapped url",
-            "domain": "original domain"
-        }}
-
-        Rules:
-        - Return exact URL match for domain
-        - If domain not found, return "ycombinator.com/jobs"
-        - Keep original domain in output
-        """,
-        model=OpenAIChatCompletionsModel(
-            model="meta-llama/Llama-3.3-70B-Instruct",
-            openai_client=client
-        )
-    )
-
     Job_search_agent = Agent(
         name="Job Finder",
         instructions=f"""You are a job finder that extracts job listings from Y Combinator's job board.
@@ -153,57 +206,16 @@ async def run_analysis(mcp_server: MCPServer, linkedin_url: str):
         )
     )
     
-    url_parser_agent = Agent(
-        name="URL Parser",
-        instructions=f"""You are a URL parser that transforms Y Combinator authentication URLs into direct job URLs.
-
-        Input: Job listings with authentication URLs in format:
-        ## Job Matches for [Domain]
-        ### [Job Title]
-        - **Company:** [Company Name]
-        - **Type:** [Job Type]
-        - **Location:** [Location]
-        - **Apply:** [Auth URL]
-
-        Rules:
-        1. Extract job_id from the authentication URL
-           - Look for 'signup_job_id=' parameter
-           - Example: from '...signup_job_id=75187...' extract '75187'
-        
-        2. Create new direct URL format:
-           - Base URL: 'https://www.workatastartup.com/jobs/'
-           - Append job_id
-           - Example: 'https://www.workatastartup.com/jobs/75187'
-
-        3. Replace the Apply URL in each job listing with the new direct URL
-
-        Output format:
-        ## Job Matches for [Domain]
-        ### [Job Title]
-        - **Company:** [Company Name]
-        - **Type:** [Job Type]
-        - **Location:** [Location]
-        - **Apply:** [Direct URL]
-
-        Note: Keep all other information exactly the same, only transform the Apply URLs.
-        """,
-        model=OpenAIChatCompletionsModel(
-            model="meta-llama/Llama-3.3-70B-Instruct",
-            openai_client=client
-        )
-    )
-    
-    summary_agent = Agent(
-        name="Summary Agent",
-        instructions=f"""You are a summary agent that creates comprehensive career analysis reports.
+    profile_report_agent = Agent(
+        name="Profile Report Agent",
+        instructions=f"""You are a summary agent that writes the profile part of a career analysis report.
         Your task is to:
-        1. Take the inputs from various agents (LinkedIn analysis, job suggestions, and job matches)
+        1. Take the inputs from the LinkedIn analysis and job suggestions agents
         2. Create a well-structured, professional summary in markdown format that includes:
            - A concise profile summary
            - Top skills identified
            - Recommended career paths
            - Detailed role suggestions with reasons and requirements
-           - Current job matches with match scores
            - Skills to develop
            - Career development suggestions
         
@@ -225,7 +237,26 @@ async def run_analysis(mcp_server: MCPServer, linkedin_url: str):
         - **Potential Companies:** [Company 1, Company 2, ...]
         - **Growth Potential:** [Growth opportunities]
         - **Salary Range:** [Salary range if available]
+        ...
+        ```
+        
+        Note: No information should be added to the response that is not provided in the input. Don't make up any information.
+        Ensure your response is well-formatted markdown that can be directly displayed.""",
+        model=OpenAIChatCompletionsModel(
+            model="meta-llama/Llama-3.3-70B-Instruct",
+            openai_client=client
+        )
+    )
 
+    job_matches_agent = Agent(
+        name="Job Matches Agent",
+        instructions=f"""You are a summary agent that scores job listings against a candidate's profile.
+        Your task is to:
+        1. Take the LinkedIn profile analysis and the job listings found for the candidate
+        2. For each job listing, write a brief description and a match score based on the profile
+        
+        Format your response in markdown with the following structure:
+        ```markdown
         ## 💼 Current Job Matches:
         ### [Job Title] at [Company]
           - [Brief description]
@@ -234,6 +265,10 @@ async def run_analysis(mcp_server: MCPServer, linkedin_url: str):
         ...
         ```
         
+        Rules:
+        - Use the Apply URL of each listing exactly as given
+        - If the listings say "No jobs found", say so under the heading
+        
         Note: No information should be added to the response that is not provided in the input. Don't make up any information.
         Ensure your response is well-formatted markdown that can be directly displayed.""",
         model=OpenAIChatCompletionsModel(
@@ -247,50 +282,81 @@ async def run_analysis(mcp_server: MCPServer, linkedin_url: str):
     Then, find the best job for the user based on their profile.
     """
 
+    timings = {} if timings is None else timings
+    cache = get_profile_cache()
+    started = time.perf_counter()
+
     try:
         # Get LinkedIn profile analysis
-        logger.info("Running LinkedIn profile analysis")
-        linkedin_result = await Runner.run(starting_agent=linkedin_agent, input=query)
-        logger.info("LinkedIn profile analysis completed")
-
-        # Get job suggestions
-        logger.info("Getting job suggestions")
-        suggestions_result = await Runner.run(starting_agent=job_suggestions_agent, input=linkedin_result.final_output)
-        logger.info("Job suggestions completed")
-
-        # Get specific job matches
-        logger.info("Getting job link")
-        job_link_result = await Runner.run(starting_agent=url_generator_agent, input=suggestions_result.final_output)
-        logger.info("Job link generation completed")
-
-        # Get job matches
-        logger.info("Getting job matches")
-        job_search_result = await Runner.run(starting_agent=Job_search_agent, input=job_link_result.final_output)
-        logger.info("Job search completed")
-
-        # Parse URLs to get direct job links
-        logger.info("Parsing job URLs")
-        parsed_urls_result = await Runner.run(starting_agent=url_parser_agent, input=job_search_result.final_output)
-        logger.info("URL parsing completed")
-
-        # Create a single input for the summary agent
-        logger.info("Generating final summary")
-        summary_input = f"""LinkedIn Profile Analysis:
-        {linkedin_result.final_output}
+        linkedin_analysis = None if force_refresh else cache.get("linkedin", linkedin_url)
+        fresh_profile = linkedin_analysis is None
+        if fresh_profile:
+            logger.info("Running LinkedIn profile analysis")
+            linkedin_result = await timed("LinkedIn analysis", Runner.run(starting_agent=linkedin_agent, input=query), timings)
+            linkedin_analysis = linkedin_result.final_output
+            cacheable = is_usable_analysis(linkedin_analysis)
+            if cacheable:
+                cache.put("linkedin", linkedin_url, linkedin_analysis)
+            else:
+                logger.warning("LinkedIn profile analysis looks failed or empty; not caching this run")
+        else:
+            cacheable = True
+            logger.info("LinkedIn profile analysis served from cache")
+
+        # Get job suggestions; recomputed whenever the profile analysis was
+        suggestions = None if fresh_profile else cache.get("suggestions", linkedin_url)
+        fresh_suggestions = suggestions is None
+        if fresh_suggestions:
+            logger.info("Getting job suggestions")
+            suggestions_result = await timed("Job suggestions", Runner.run(starting_agent=job_suggestions_agent, input=linkedin_analysis), timings)
+            suggestions = suggestions_result.final_output
+            # Only cache a classification that maps to a known job board
+            cacheable = cacheable and selected_domain(suggestions) in DOMAIN_JOB_URLS
+            if cacheable:
+                cache.put("suggestions", linkedin_url, suggestions)
+        else:
+            logger.info("Job suggestions served from cache")
+
+        async def profile_report():
+            # A cached report is only valid for the cached inputs it was written from
+            report = None if fresh_suggestions else cache.get("profile_report", linkedin_url)
+            if report is not None:
+                logger.info("Profile report served from cache")
+                return report
+            report_input = f"""LinkedIn Profile Analysis:
+        {linkedin_analysis}
 
         Job Suggestions:
-        {suggestions_result.final_output}
+        {suggestions}
+
+        Please analyze the above information and create the profile part of a career analysis report in markdown format."""
+            report_result = await timed("Profile report", Runner.run(starting_agent=profile_report_agent, input=report_input), timings)
+            report = report_result.final_output
+            if cacheable and report and report.strip():
+                cache.put("profile_report", linkedin_url, report)
+            return report
+
+        async def job_matches():
+            # Job listings change daily, so this branch always runs
+            job_link = job_board_link(suggestions)
+            logger.info(f"Getting job matches from {job_link}")
+            job_search_result = await timed("Job search", Runner.run(starting_agent=Job_search_agent, input=job_link), timings)
+            matches_input = f"""LinkedIn Profile Analysis:
+        {linkedin_analysis}
 
         Job Matches:
-        {parsed_urls_result.final_output}
+        {direct_job_urls(job_search_result.final_output)}
 
-        Please analyze the above information and create a comprehensive career analysis report in markdown format."""
-        
-        # Get final summary with a single call
-        summary_result = await Runner.run(starting_agent=summary_agent, input=summary_input)
-        logger.info("Summary generation completed")
-        return summary_result.final_output
+        Please score the above job listings against the profile in markdown format."""
+            matches_result = await timed("Job match summary", Runner.run(starting_agent=job_matches_agent, input=matches_input), timings)
+            return matches_result.final_output
+
+        # The profile report only needs the analysis and suggestions, so it runs alongside the job search
+        report, matches = await asyncio.gather(profile_report(), job_matches())
+        timings["Total"] = time.perf_counter() - started
+        logger.info("Stage timings: " + ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in timings.items()))
+        return f"{report}\n\n{matches}"
 
     except Exception as e:
         logger.error(f"Error during analysis: {str(e)}")
-        raise e 
\ No newline at end of file
+        raise e
\ No newline at end of file
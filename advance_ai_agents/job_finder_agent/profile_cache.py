@@ -0,0 +1,71 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+from urllib.parse import urlsplit
+
+PROFILE_CACHE_FILE = os.getenv("PROFILE_CACHE_FILE", "profile_cache.db")
+# Profiles change slowly; analyses younger than this are reused for repeated runs
+PROFILE_CACHE_TTL = int(os.getenv("PROFILE_CACHE_TTL", str(24 * 60 * 60)))
+
+
+def normalize_profile_url(url: str) -> str:
+    """Reduce a LinkedIn profile URL to host + path so scheme, www, query and trailing slash variants share a key."""
+    parts = urlsplit(url.strip() if "://" in url else f"https://{url.strip()}")
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    return f"{host}{parts.path.rstrip('/').lower()}"
+
+
+class ProfileCache:
+    """
+    On-disk cache (SQLite, WAL) for per-profile agent outputs.
+    Entries are keyed by kind plus the normalized profile URL and expire after `ttl` seconds.
+    """
+
+    def __init__(self, path: str = PROFILE_CACHE_FILE, ttl: int = PROFILE_CACHE_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS profile_cache (
+                kind TEXT NOT NULL,
+                url TEXT NOT NULL,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (kind, url)
+            )"""
+        )
+        self._conn.commit()
+
+    def get(self, kind: str, url: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM profile_cache WHERE kind = ? AND url = ?",
+                (kind, normalize_profile_url(url)),
+            ).fetchone()
+        if row is None or time.time() - row[1] > self.ttl:
+            return None
+        return row[0]
+
+    def put(self, kind: str, url: str, value: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO profile_cache (kind, url, value, created_at) VALUES (?, ?, ?, ?)",
+                (kind, normalize_profile_url(url), value, time.time()),
+            )
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_profile_cache() -> ProfileCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ProfileCache()
+        return _cache
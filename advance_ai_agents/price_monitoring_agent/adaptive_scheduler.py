@@ -0,0 +1,161 @@
+import heapq
+import json
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from agents.crewai_agents import is_product_data, run_agents
+from agents.decision_logic import is_significant_change
+from storage.price_history import get_store
+
+TRACKED_URLS_FILE = "tracked_urls.json"
+
+MIN_INTERVAL = int(os.getenv("PRICE_CHECK_MIN_INTERVAL", "300"))
+BASE_INTERVAL = int(os.getenv("PRICE_CHECK_BASE_INTERVAL", "1800"))
+MAX_INTERVAL = int(os.getenv("PRICE_CHECK_MAX_INTERVAL", "21600"))
+MAX_WORKERS = int(os.getenv("PRICE_CHECK_WORKERS", "8"))
+PER_DOMAIN_LIMIT = int(os.getenv("PRICE_CHECK_PER_DOMAIN", "2"))
+
+# Stable products back off by this factor per unchanged check
+BACKOFF = 1.5
+# Relative price range (max-min)/last over the stats window that counts as volatile
+VOLATILITY_THRESHOLD = 0.02
+STATS_WINDOW = 7 * 24 * 60 * 60
+DOMAIN_RETRY_DELAY = 15
+
+
+def load_tracked(file_path=TRACKED_URLS_FILE):
+    if os.path.exists(file_path):
+        try:
+            with open(file_path, "r") as f:
+                return json.load(f)
+        except json.JSONDecodeError:
+            return {}
+    return {}
+
+
+def next_interval(previous_interval, changed, stats):
+    """
+    Pick the delay before the next check of a product:
+    changed products drop to the minimum, stable ones back off towards MAX_INTERVAL
+    and volatile products are capped at half the base interval.
+    """
+    if changed:
+        interval = MIN_INTERVAL
+    else:
+        interval = min(previous_interval * BACKOFF, MAX_INTERVAL)
+
+    last = stats.get("last")
+    if last and stats.get("count", 0) > 1:
+        volatility = (stats["max"] - stats["min"]) / last
+        if volatility >= VOLATILITY_THRESHOLD:
+            interval = min(interval, BASE_INTERVAL / 2)
+
+    return max(MIN_INTERVAL, interval)
+
+
+class AdaptiveScheduler:
+    """
+    Polls each tracked URL on its own schedule using a priority queue of next-check times,
+    with a global worker pool and a cap on concurrent checks per domain.
+    """
+
+    def __init__(self, tracked_file=TRACKED_URLS_FILE, max_workers=MAX_WORKERS, per_domain_limit=PER_DOMAIN_LIMIT):
+        self.tracked_file = tracked_file
+        self.per_domain_limit = per_domain_limit
+        self.store = get_store()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="price-check")
+        self._queue = []  # (next_check_ts, url)
+        self._scheduled = set()
+        self._intervals = {}
+        self._tracked = {}
+        self._in_flight = defaultdict(int)
+        self._cond = threading.Condition()
+        self._stopped = False
+
+    def refresh_tracked(self):
+        """Pick up added/removed URLs; new ones are staggered over the first minute."""
+        tracked = load_tracked(self.tracked_file)
+        now = time.time()
+        with self._cond:
+            self._tracked = tracked
+            for url in tracked:
+                if url not in self._scheduled and url not in self._intervals:
+                    self._intervals[url] = BASE_INTERVAL
+                    self._push(now + random.uniform(0, 60), url)
+
+    def _push(self, when, url):
+        heapq.heappush(self._queue, (when, url))
+        self._scheduled.add(url)
+        self._cond.notify()
+
+    def _dispatch_due(self):
+        """Submit every due URL whose domain has a free slot; defer the rest."""
+        now = time.time()
+        deferred = []
+        while self._queue and self._queue[0][0] <= now:
+            _, url = heapq.heappop(self._queue)
+            self._scheduled.discard(url)
+            if url not in self._tracked:
+                self._intervals.pop(url, None)
+                continue
+            domain = urlparse(url).netloc
+            if self._in_flight[domain] >= self.per_domain_limit:
+                deferred.append((now + DOMAIN_RETRY_DELAY, url))
+                continue
+            self._in_flight[domain] += 1
+            self.executor.submit(self._check, url, domain)
+        for when, url in deferred:
+            self._push(when, url)
+
+    def _check(self, url, domain):
+        changed = False
+        try:
+            previous_data = self.store.latest(url)
+            new_data = run_agents(url, previous_data, persist=False)
+            if is_product_data(new_data):
+                self.store.append(url, new_data)
+                changed = is_significant_change(previous_data, new_data)
+        except Exception as e:
+            print(f"[adaptive_scheduler] {url} failed: {e}")
+        finally:
+            self._reschedule(url, domain, changed)
+
+    def _reschedule(self, url, domain, changed):
+        """Release the domain slot and queue the next check; the URL is always pushed back."""
+        previous_interval = self._intervals.get(url, BASE_INTERVAL)
+        try:
+            stats = self.store.price_stats(url, window_seconds=STATS_WINDOW)
+            interval = next_interval(previous_interval, changed, stats)
+        except Exception as e:
+            print(f"[adaptive_scheduler] {url} interval computation failed: {e}")
+            interval = max(MIN_INTERVAL, previous_interval)
+        with self._cond:
+            self._in_flight[domain] -= 1
+            self._intervals[url] = interval
+            self._push(time.time() + interval, url)
+
+    def run_forever(self, refresh_every=60):
+        last_refresh = 0
+        while not self._stopped:
+            if time.time() - last_refresh >= refresh_every:
+                self.refresh_tracked()
+                last_refresh = time.time()
+            with self._cond:
+                self._dispatch_due()
+                wait = self._queue[0][0] - time.time() if self._queue else refresh_every
+                self._cond.wait(timeout=max(0.5, min(wait, refresh_every)))
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        self.executor.shutdown(wait=True)
+
+
+if __name__ == "__main__":
+    AdaptiveScheduler().run_forever()
@@ -1,12 +1,30 @@
 import os
 import json
+import threading
 from dotenv import load_dotenv
 from crewai import Agent, Task, Crew
 import litellm
 from crewai_tools import ScrapegraphScrapeTool
 from tools.custom_tools import DecisionTool, NotifyTool
-
-PRODUCT_DATA_FILE = "product_data.json"
+from agents.decision_logic import ALERT_FIELDS, is_significant_change
+from storage.price_history import get_store
+
+SCRAPE_PROMPT = (
+    "Extract ONLY the following information from the product page in strict JSON format:\n"
+    "{\n"
+    '  "title": "Product Name",\n'
+    '  "current_price": "1234.56 INR",\n'
+    '  "availability": "In Stock",\n'
+    '  "rating": "4.5",\n'
+    '  "image_url": "https://example.com/image.jpg",\n'
+    '  "description": "Product description here",\n'
+    '  "brand": "Brand Name",\n'
+    '  "recommended_uses_for_product": "Recommended uses here"\n'
+    "}\n"
+    "Use N/A for missing fields. Only include these fields."
+)
+
+SCRAPE_FAILED = {"error": "Could not extract product data from the page."}
 
 class NebiusLLM:
     def __init__(self, api_key, model="nebius/Qwen/Qwen3-14B"):
@@ -29,21 +47,6 @@ class NebiusLLM:
             return {"error": "Error generating response from LLM."}
 
 
-def load_json(file_path, default_value):
-    if os.path.exists(file_path):
-        try:
-            with open(file_path, "r") as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            return default_value
-    return default_value
-
-
-def save_json(file_path, data):
-    with open(file_path, "w") as f:
-        json.dump(data, f, indent=2)
-
-
 def generate_message(data):
     return (
         f"{data.get('title', 'Unknown Product')} is now "
@@ -52,26 +55,23 @@ def generate_message(data):
     )
 
 
-def run_agents(product_url, previous_data=None):
-    load_dotenv("api.env")
+_local = threading.local()
 
-    if not product_url or not product_url.startswith(("http://", "https://")):
-        return {"error": "No valid product URL provided."}
 
-    all_previous_data = load_json(PRODUCT_DATA_FILE, {})
-    if previous_data is None:
-        previous_data = all_previous_data.get(product_url, {})
+def get_crew_components(nebius_api_key, scrapegraph_api_key):
+    """
+    Build the LLM, tools and agents once per worker thread and reuse them for every URL.
+    Components are thread-local because DecisionTool carries per-product state.
+    """
+    keys = (nebius_api_key, scrapegraph_api_key)
+    components = getattr(_local, "components", None)
+    if components is not None and components["keys"] == keys:
+        return components
 
-    NEBIUS_API_KEY = os.getenv("NEBIUS_API_KEY")
-    SCRAPEGRAPH_API_KEY = os.getenv("SCRAPEGRAPH_API_KEY")
-
-    if not NEBIUS_API_KEY or not SCRAPEGRAPH_API_KEY:
-        raise ValueError("API keys missing in api.env!")
-
-    nebius_llm = NebiusLLM(api_key=NEBIUS_API_KEY)
+    nebius_llm = NebiusLLM(api_key=nebius_api_key)
 
-    scraper_tool = ScrapegraphScrapeTool(api_key=SCRAPEGRAPH_API_KEY)
-    decision_tool = DecisionTool(previous_data=previous_data)
+    scraper_tool = ScrapegraphScrapeTool(api_key=scrapegraph_api_key)
+    decision_tool = DecisionTool(previous_data={})
     notify_tool = NotifyTool(generate_message_fn=generate_message)
 
     scraper_agent = Agent(
@@ -101,6 +101,102 @@ def run_agents(product_url, previous_data=None):
         llm=nebius_llm
     )
 
+    components = {
+        "keys": keys,
+        "llm": nebius_llm,
+        "scraper_tool": scraper_tool,
+        "decision_tool": decision_tool,
+        "notify_tool": notify_tool,
+        "scraper_agent": scraper_agent,
+        "decision_agent": decision_agent,
+        "notifier_agent": notifier_agent,
+    }
+    _local.components = components
+    return components
+
+
+def parse_scrape_result(response):
+    """Normalize a ScrapeGraph smartscraper response into a flat product dict (None if unusable)."""
+    if isinstance(response, dict) and "result" in response:
+        response = response["result"]
+    if isinstance(response, str):
+        try:
+            response = json.loads(response)
+        except json.JSONDecodeError:
+            return None
+    if not isinstance(response, dict) or not response:
+        return None
+    return response
+
+
+def is_product_data(data):
+    """False for empty results and the {"error": ...} dicts returned when a check fails."""
+    return isinstance(data, dict) and bool(data) and "error" not in data
+
+
+def generate_alert_message(llm, previous_data, new_data):
+    """Ask the LLM for a short alert; fall back to the template message if it fails."""
+    prompt = (
+        "Write a short SMS price alert (max 300 characters) for this product change. "
+        "Mention the product, the old and new price and availability. Return only the message.\n"
+        f"Previous: {json.dumps({k: previous_data.get(k) for k in ALERT_FIELDS})}\n"
+        f"Current: {json.dumps({k: new_data.get(k) for k in ALERT_FIELDS})}"
+    )
+    message = llm(prompt)
+    if isinstance(message, str) and message.strip():
+        return message.strip()
+    return generate_message(new_data)
+
+
+def run_agents(product_url, previous_data=None, persist=True, fast_path=True):
+    """
+    Check a product URL. The fast path scrapes structured data directly and compares it
+    with the previous snapshot; the LLM is only used to write the alert when something
+    changed. fast_path=False runs the full scraper/decision/notifier crew.
+    A failed scrape returns SCRAPE_FAILED without alerting or persisting anything.
+    """
+    load_dotenv("api.env")
+
+    if not product_url or not product_url.startswith(("http://", "https://")):
+        return {"error": "No valid product URL provided."}
+
+    if previous_data is None:
+        previous_data = get_store().latest(product_url)
+
+    NEBIUS_API_KEY = os.getenv("NEBIUS_API_KEY")
+    SCRAPEGRAPH_API_KEY = os.getenv("SCRAPEGRAPH_API_KEY")
+
+    if not NEBIUS_API_KEY or not SCRAPEGRAPH_API_KEY:
+        raise ValueError("API keys missing in api.env!")
+
+    components = get_crew_components(NEBIUS_API_KEY, SCRAPEGRAPH_API_KEY)
+
+    if fast_path:
+        scraped_data = parse_scrape_result(
+            components["scraper_tool"]._run(website_url=product_url, user_prompt=SCRAPE_PROMPT)
+        )
+        if scraped_data is None:
+            return dict(SCRAPE_FAILED)
+        if is_significant_change(previous_data, scraped_data):
+            message = generate_alert_message(components["llm"], previous_data, scraped_data)
+            components["notify_tool"]._run(scraped_data, message=message, key=product_url)
+    else:
+        scraped_data = run_crew(product_url, previous_data, components)
+        if scraped_data is None:
+            return dict(SCRAPE_FAILED)
+
+    if persist:
+        get_store().append(product_url, scraped_data)
+
+    return scraped_data
+
+
+def run_crew(product_url, previous_data, components):
+    components["decision_tool"].previous_data = previous_data
+    scraper_agent = components["scraper_agent"]
+    decision_agent = components["decision_agent"]
+    notifier_agent = components["notifier_agent"]
+
     scrape_task = Task(
         agent=scraper_agent,
         description=f"Scrape the latest product data from: {product_url}",
@@ -111,20 +207,7 @@ def run_agents(product_url, previous_data=None):
         ),
         tool_kwargs={
             "website_url": product_url,
-            "user_prompt": (
-                "Extract ONLY the following information from the product page in strict JSON format:\n"
-                "{\n"
-                '  "title": "Product Name",\n'
-                '  "current_price": "1234.56 INR",\n'
-                '  "availability": "In Stock",\n'
-                '  "rating": "4.5",\n'
-                '  "image_url": "https://example.com/image.jpg",\n'
-                '  "description": "Product description here",\n'
-                '  "brand": "Brand Name",\n'
-                '  "recommended_uses_for_product": "Recommended uses here"\n'
-                "}\n"
-                "Use N/A for missing fields. Only include these fields."
-            )
+            "user_prompt": SCRAPE_PROMPT
         },
         output_key="scraped_data"
     )
@@ -151,25 +234,13 @@ def run_agents(product_url, previous_data=None):
     )
     crew.kickoff()
 
-    scraped_data = {}
+    scraped_data = None
     if hasattr(scrape_task, "output") and scrape_task.output:
-        try:
-            raw = getattr(scrape_task.output, "raw_output", None) or str(scrape_task.output)
-            scraped_data = json.loads(raw) if isinstance(raw, str) else raw
-        except Exception:
-            scraped_data = {
-                "title": "N/A",
-                "current_price": "N/A",
-                "availability": "Unknown",
-                "rating": "N/A",
-                "image_url": ""
-            }
-
-    for tool in notifier_agent.tools:
-        if isinstance(tool, NotifyTool):
-            tool._run(scraped_data)
-
-    all_previous_data[product_url] = scraped_data
-    save_json(PRODUCT_DATA_FILE, all_previous_data)
+        raw = getattr(scrape_task.output, "raw_output", None) or str(scrape_task.output)
+        scraped_data = parse_scrape_result(raw)
+    if scraped_data is None:
+        return None
+
+    components["notify_tool"]._run(scraped_data)
 
     return scraped_data
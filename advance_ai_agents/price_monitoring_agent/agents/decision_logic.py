@@ -1,3 +1,7 @@
+# Fields whose change should trigger an alert
+ALERT_FIELDS = ("current_price", "availability")
+
+
 def is_significant_change(old_data, new_data):
     if not old_data or not new_data:
         return True
@@ -2,7 +2,8 @@ import os
 import json
 import streamlit as st
 from dotenv import load_dotenv
-from agents.crewai_agents import run_agents
+from agents.crewai_agents import is_product_data, run_agents
+from storage.price_history import get_store
 from datetime import datetime
 import base64
 load_dotenv("api.env")
@@ -115,6 +116,9 @@ if st.session_state["history"]:
             with st.spinner(f"Fetching data for {url[:40]}..."):
                 try:
                     product_data = run_agents(url, old_data)
+                    if isinstance(product_data, dict) and not is_product_data(product_data):
+                        st.error(f"Failed to track {url[:40]}: {product_data.get('error', 'no data returned')}")
+                        continue
                     if not isinstance(product_data, dict):
                         try:
                             product_data = json.loads(product_data)
@@ -188,6 +192,13 @@ if st.session_state["history"]:
                         if description:
                             with st.expander("Description"):
                                 st.write(description)
+                    # Price history from the SQLite store (only this product's rows are loaded)
+                    store = get_store()
+                    history = [(datetime.fromtimestamp(ts), value) for ts, value, _ in store.history(url, window_seconds=30 * 86400) if value is not None]
+                    if len(history) > 1:
+                        stats = store.price_stats(url, window_seconds=30 * 86400)
+                        st.markdown(f"**30-day range:** {stats['min']:,.2f} – {stats['max']:,.2f} (trend {stats['trend_per_day']:+,.2f}/day)")
+                        st.line_chart({"price": dict(history)})
 else:
     st.info("No products being tracked. Add products above.")
 
@@ -0,0 +1,163 @@
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from twilio.base.exceptions import TwilioRestException
+
+from notifier import email_notifier
+from notifier.email_notifier import _truncate_message
+
+NOTIFY_BATCH_WINDOW = float(os.getenv("NOTIFY_BATCH_WINDOW", "60"))
+NOTIFY_MAX_RETRIES = int(os.getenv("NOTIFY_MAX_RETRIES", "3"))
+
+FROM_NUMBER_ENV = {"sms": "TWILIO_PHONE_NUMBER", "whatsapp": "TWILIO_WHATSAPP_NUMBER"}
+
+
+class NotificationError(Exception):
+    """A failed send that may succeed on retry (rate limits, Twilio 5xx, network errors)."""
+
+
+class PermanentNotificationError(NotificationError):
+    """A failed send that cannot succeed on retry (missing configuration, request rejected by Twilio)."""
+
+
+class TwilioTransport:
+    """Sends one message through the Twilio client, classifying failures as transient or permanent."""
+
+    def send(self, channel, to_number, body):
+        client = email_notifier._client
+        if client is None:
+            raise PermanentNotificationError("Twilio credentials missing!")
+        from_number = os.getenv(FROM_NUMBER_ENV[channel])
+        if not to_number or not from_number:
+            raise PermanentNotificationError("Missing phone numbers!")
+
+        if channel == "whatsapp":
+            from_number = f"whatsapp:{from_number}"
+            to_number = f"whatsapp:{to_number}"
+        try:
+            message = client.messages.create(body=body, from_=from_number, to=to_number)
+        except TwilioRestException as e:
+            # 429 and 5xx are transient; any other 4xx means the request itself is invalid
+            if e.status == 429 or e.status >= 500:
+                raise NotificationError(str(e)) from e
+            raise PermanentNotificationError(str(e)) from e
+        return f"[✅ {channel.upper()} Sent] SID: {message.sid}"
+
+
+class FakeTransport:
+    """
+    In-memory stand-in for TwilioTransport in tests. Every attempt is recorded in `calls`;
+    the queued `errors` are raised by the first sends, in order, and successful sends land in `sent`.
+    """
+
+    def __init__(self, errors=(), delay=0.0):
+        self.errors = list(errors)
+        self.delay = delay
+        self.calls = []
+        self.sent = []
+        self._lock = threading.Lock()
+
+    def send(self, channel, to_number, body):
+        with self._lock:
+            self.calls.append((channel, to_number, body))
+            error = self.errors.pop(0) if self.errors else None
+        if self.delay:
+            time.sleep(self.delay)
+        if error is not None:
+            raise error
+        with self._lock:
+            self.sent.append((channel, to_number, body))
+        return f"[✅ {channel.upper()} Sent] SID: fake-{len(self.sent)}"
+
+
+class NotificationQueue:
+    """
+    Collects alerts per recipient and sends one digest per recipient every `window` seconds.
+    Repeated alerts for the same product within a window are deduplicated (latest wins),
+    channels are sent concurrently and transient failures are retried with exponential backoff.
+    """
+
+    def __init__(self, transport=None, window=NOTIFY_BATCH_WINDOW, max_retries=NOTIFY_MAX_RETRIES,
+                 base_delay=1.0, max_workers=4):
+        self.transport = transport or TwilioTransport()
+        self.window = window
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self._pending = {}  # recipient key -> {"recipient": ..., "channels": [...], "messages": {key: body}}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="notify")
+        self._timer = None
+
+    def enqueue(self, subject, body, recipient, channels=("sms", "whatsapp"), key=None):
+        recipient_key = tuple(sorted((channel, number) for channel, number in recipient.items() if number))
+        if not recipient_key:
+            return {"subject": subject, "body": body, "recipient": recipient, "status": "no recipient"}
+
+        with self._lock:
+            entry = self._pending.setdefault(
+                recipient_key, {"recipient": recipient, "channels": list(channels), "messages": {}}
+            )
+            entry["messages"][key or body] = body
+            if self._timer is None and self.window > 0:
+                self._timer = threading.Timer(self.window, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+        if self.window <= 0:
+            return self.flush()[0]
+        return {"subject": subject, "body": body, "recipient": recipient, "status": "queued"}
+
+    def flush(self):
+        """Send every pending digest now and return the per-recipient results."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+        results = []
+        for entry in pending.values():
+            messages = list(entry["messages"].values())
+            body = messages[0] if len(messages) == 1 else (
+                f"{len(messages)} price alerts:\n" + "\n".join(f"- {message}" for message in messages)
+            )
+            results.append(self._send_digest(entry["recipient"], entry["channels"], _truncate_message(body)))
+        return results
+
+    def _send_digest(self, recipient, channels, body):
+        futures = {
+            channel: self._executor.submit(self._send_with_retry, channel, recipient[channel], body)
+            for channel in channels if recipient.get(channel)
+        }
+        return {
+            "subject": "Price Alert",
+            "body": body,
+            "recipient": recipient,
+            "status": {channel: future.result() for channel, future in futures.items()},
+        }
+
+    def _send_with_retry(self, channel, to_number, body):
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self.transport.send(channel, to_number, body)
+            except PermanentNotificationError as e:
+                return f"[{channel.upper()} Failed] {e}"
+            except Exception as e:
+                if attempt == self.max_retries:
+                    return f"[{channel.upper()} Failed] {e}"
+                time.sleep(self.base_delay * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_notification_queue():
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = NotificationQueue()
+        return _queue
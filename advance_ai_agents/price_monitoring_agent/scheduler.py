@@ -1,10 +1,13 @@
 import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from apscheduler.schedulers.blocking import BlockingScheduler
-from agents.crewai_agents import run_agents
+from agents.crewai_agents import is_product_data, run_agents
+from storage.price_history import get_store
+from notifier.notification_queue import get_notification_queue
 import os
 
 TRACKED_URLS_FILE = "tracked_urls.json"
-PRODUCT_DATA_FILE = "product_data.json"
+MAX_WORKERS = int(os.getenv("PRICE_CHECK_WORKERS", "8"))
 
 def load_json(file_path, default_value):
     if os.path.exists(file_path):
@@ -15,26 +18,29 @@ def load_json(file_path, default_value):
             return default_value
     return default_value
 
-def save_json(file_path, data):
-    with open(file_path, "w") as f:
-        json.dump(data, f, indent=2)
-
-def check_prices():
+def check_prices(max_workers=MAX_WORKERS):
     tracked_data = load_json(TRACKED_URLS_FILE, {})
-    previous_data_all = load_json(PRODUCT_DATA_FILE, {})
-    updated_data_all = {}
-
-    for url, old_data in tracked_data.items():
-        try:
-            prev_data = previous_data_all.get(url, {})
-            new_data = run_agents(url, prev_data)
-            updated_data_all[url] = new_data if new_data else prev_data
-        except Exception:
-            updated_data_all[url] = previous_data_all.get(url, {})
-
-    save_json(PRODUCT_DATA_FILE, updated_data_all)
+    store = get_store()
+    previous_data_all = store.latest_all(tracked_data.keys())
+
+    # Each worker thread reuses its own LLM/tool/agent set across the URLs it checks
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="price-check") as executor:
+        futures = {
+            executor.submit(run_agents, url, previous_data_all[url], persist=False): url
+            for url in tracked_data
+        }
+        for future in as_completed(futures):
+            url = futures[future]
+            try:
+                new_data = future.result()
+                # Append each result as it completes so a crash keeps finished checks
+                if is_product_data(new_data):
+                    store.append(url, new_data)
+            except Exception as e:
+                print(f"[check_prices] {url} failed: {e}")
+
+    # Send this run's alerts as one digest per recipient
+    get_notification_queue().flush()
 
 scheduler = BlockingScheduler()
-scheduler.add_job(check_prices, 'interval', minutes=30)
-
-
+scheduler.add_job(check_prices, 'interval', minutes=30, max_instances=1, coalesce=True)
@@ -0,0 +1,175 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+PRICE_DB_FILE = os.getenv("PRICE_DB_FILE", "price_history.db")
+LEGACY_PRODUCT_DATA_FILE = "product_data.json"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS price_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL,
+    ts REAL NOT NULL,
+    title TEXT,
+    current_price TEXT,
+    price_value REAL,
+    availability TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_price_history_url_ts ON price_history (url, ts);
+"""
+
+
+def parse_price(price):
+    """Turn a scraped price like '₹90,900.00' or '1234.56 INR' into a float (None if unparseable)."""
+    if isinstance(price, (int, float)):
+        return float(price)
+    if not isinstance(price, str):
+        return None
+    match = re.search(r"\d[\d,]*(?:\.\d+)?", price)
+    if not match:
+        return None
+    try:
+        return float(match.group(0).replace(",", ""))
+    except ValueError:
+        return None
+
+
+class PriceHistoryStore:
+    """
+    Append-only price history in SQLite (WAL mode).
+    Each thread gets its own connection; every append is a single atomic transaction.
+    """
+
+    def __init__(self, db_path=PRICE_DB_FILE):
+        self.db_path = db_path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def append(self, url, data, ts=None):
+        """Record one snapshot for a product."""
+        data = data or {}
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO price_history (url, ts, title, current_price, price_value, availability, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    url,
+                    ts if ts is not None else time.time(),
+                    data.get("title"),
+                    str(data.get("current_price")) if data.get("current_price") is not None else None,
+                    parse_price(data.get("current_price")),
+                    data.get("availability"),
+                    json.dumps(data),
+                ),
+            )
+
+    def latest(self, url):
+        """Most recent snapshot for a product, or {} if it was never checked."""
+        row = self._connect().execute(
+            "SELECT data FROM price_history WHERE url = ? ORDER BY ts DESC LIMIT 1", (url,)
+        ).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def latest_all(self, urls=None):
+        """Most recent snapshot per product, optionally restricted to the given URLs."""
+        rows = self._connect().execute(
+            "SELECT h.url, h.data FROM price_history h "
+            "JOIN (SELECT url, MAX(ts) AS ts FROM price_history GROUP BY url) last "
+            "ON h.url = last.url AND h.ts = last.ts"
+        ).fetchall()
+        latest = {url: json.loads(data) for url, data in rows}
+        if urls is not None:
+            return {url: latest.get(url, {}) for url in urls}
+        return latest
+
+    def history(self, url, window_seconds=None):
+        """(ts, price_value, availability) rows for a product, oldest first."""
+        since = time.time() - window_seconds if window_seconds else 0
+        return self._connect().execute(
+            "SELECT ts, price_value, availability FROM price_history "
+            "WHERE url = ? AND ts >= ? ORDER BY ts",
+            (url, since),
+        ).fetchall()
+
+    def price_stats(self, url, window_seconds=None):
+        """Min, max, first, last and trend (price change per day) over a window."""
+        since = time.time() - window_seconds if window_seconds else 0
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT MIN(price_value), MAX(price_value), COUNT(price_value) FROM price_history "
+            "WHERE url = ? AND ts >= ? AND price_value IS NOT NULL",
+            (url, since),
+        ).fetchone()
+        min_price, max_price, count = row
+        if not count:
+            return {"min": None, "max": None, "first": None, "last": None, "count": 0, "trend_per_day": None}
+
+        points = conn.execute(
+            "SELECT ts, price_value FROM price_history "
+            "WHERE url = ? AND ts >= ? AND price_value IS NOT NULL ORDER BY ts",
+            (url, since),
+        ).fetchall()
+        return {
+            "min": min_price,
+            "max": max_price,
+            "first": points[0][1],
+            "last": points[-1][1],
+            "count": count,
+            "trend_per_day": _slope(points) * 86400 if count > 1 else 0.0,
+        }
+
+    def import_json(self, file_path=LEGACY_PRODUCT_DATA_FILE):
+        """One-off import of the old product_data.json snapshot file into an empty store."""
+        if not os.path.exists(file_path):
+            return 0
+        if self._connect().execute("SELECT 1 FROM price_history LIMIT 1").fetchone():
+            return 0
+        try:
+            with open(file_path, "r") as f:
+                snapshot = json.load(f)
+        except json.JSONDecodeError:
+            return 0
+        ts = os.path.getmtime(file_path)
+        for url, data in snapshot.items():
+            if data:
+                self.append(url, data, ts=ts)
+        return len(snapshot)
+
+
+def _slope(points):
+    """Least-squares slope of price over time (price per second)."""
+    n = len(points)
+    mean_t = sum(t for t, _ in points) / n
+    mean_p = sum(p for _, p in points) / n
+    var_t = sum((t - mean_t) ** 2 for t, _ in points)
+    if var_t == 0:
+        return 0.0
+    return sum((t - mean_t) * (p - mean_p) for t, p in points) / var_t
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store(db_path=PRICE_DB_FILE):
+    """Process-wide store, created on first use (migrating product_data.json if present)."""
+    global _store
+    with _store_lock:
+        if _store is None or _store.db_path != db_path:
+            _store = PriceHistoryStore(db_path)
+            _store.import_json()
+        return _store
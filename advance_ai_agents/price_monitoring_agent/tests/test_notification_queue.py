@@ -0,0 +1,167 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+from twilio.base.exceptions import TwilioRestException
+
+from notifier import email_notifier
+from notifier.notification_queue import (
+    FakeTransport,
+    NotificationError,
+    NotificationQueue,
+    PermanentNotificationError,
+    TwilioTransport,
+)
+
+RECIPIENT = {"sms": "+15550001111", "whatsapp": "+15550002222"}
+
+
+def make_queue(transport, **kwargs):
+    # A long window keeps the background timer out of the way; tests flush explicitly
+    kwargs.setdefault("window", 3600)
+    kwargs.setdefault("base_delay", 0)
+    return NotificationQueue(transport=transport, **kwargs)
+
+
+class StubTwilioClient:
+    """Twilio client whose messages.create raises the queued exceptions before succeeding."""
+
+    def __init__(self, errors=()):
+        self.errors = list(errors)
+        self.calls = 0
+        self.messages = SimpleNamespace(create=self._create)
+
+    def _create(self, body, from_, to):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return SimpleNamespace(sid=f"SM{self.calls}")
+
+
+@pytest.fixture
+def twilio_client(monkeypatch):
+    def install(errors=()):
+        client = StubTwilioClient(errors)
+        monkeypatch.setattr(email_notifier, "_client", client)
+        monkeypatch.setenv("TWILIO_PHONE_NUMBER", "+15559990000")
+        monkeypatch.setenv("TWILIO_WHATSAPP_NUMBER", "+15559990001")
+        return client
+
+    return install
+
+
+def test_changes_within_window_are_coalesced_into_one_digest():
+    transport = FakeTransport()
+    queue = make_queue(transport)
+    sms_only = {"sms": RECIPIENT["sms"]}
+
+    assert queue.enqueue("Price Alert", "Mouse now $25", sms_only, channels=("sms",), key="mouse")["status"] == "queued"
+    queue.enqueue("Price Alert", "Keyboard now $40", sms_only, channels=("sms",), key="keyboard")
+    queue.enqueue("Price Alert", "Mouse now $20", sms_only, channels=("sms",), key="mouse")
+    results = queue.flush()
+
+    assert len(results) == 1
+    assert len(transport.sent) == 1
+    channel, to_number, body = transport.sent[0]
+    assert (channel, to_number) == ("sms", RECIPIENT["sms"])
+    assert body.startswith("2 price alerts:")
+    assert "Mouse now $20" in body and "Keyboard now $40" in body
+    assert "Mouse now $25" not in body
+    assert queue.flush() == []
+
+
+def test_single_change_is_sent_without_digest_header():
+    transport = FakeTransport()
+    queue = make_queue(transport)
+
+    queue.enqueue("Price Alert", "Mouse now $20", {"sms": RECIPIENT["sms"]}, channels=("sms",))
+    queue.flush()
+
+    assert transport.sent == [("sms", RECIPIENT["sms"], "Mouse now $20")]
+
+
+def test_sms_and_whatsapp_are_sent_concurrently():
+    both_in_flight = threading.Barrier(2, timeout=5)
+
+    class BarrierTransport(FakeTransport):
+        def send(self, channel, to_number, body):
+            # Only returns once the other channel's send has started too
+            both_in_flight.wait()
+            return super().send(channel, to_number, body)
+
+    transport = BarrierTransport()
+    queue = make_queue(transport, max_retries=0)
+
+    queue.enqueue("Price Alert", "Mouse now $20", RECIPIENT)
+    [result] = queue.flush()
+
+    assert set(result["status"]) == {"sms", "whatsapp"}
+    assert all("Sent]" in status for status in result["status"].values())
+    assert sorted(channel for channel, _, _ in transport.sent) == ["sms", "whatsapp"]
+
+
+def test_transient_failure_is_retried():
+    transport = FakeTransport(errors=[NotificationError("rate limited"), NotificationError("503")])
+    queue = make_queue(transport, max_retries=3)
+
+    queue.enqueue("Price Alert", "Mouse now $20", {"sms": RECIPIENT["sms"]}, channels=("sms",))
+    [result] = queue.flush()
+
+    assert len(transport.calls) == 3
+    assert result["status"]["sms"].startswith("[✅ SMS Sent]")
+
+
+def test_transient_failure_gives_up_after_max_retries():
+    transport = FakeTransport(errors=[NotificationError("503")] * 5)
+    queue = make_queue(transport, max_retries=2)
+
+    queue.enqueue("Price Alert", "Mouse now $20", {"sms": RECIPIENT["sms"]}, channels=("sms",))
+    [result] = queue.flush()
+
+    assert len(transport.calls) == 3
+    assert result["status"]["sms"] == "[SMS Failed] 503"
+
+
+def test_permanent_failure_is_not_retried():
+    transport = FakeTransport(errors=[PermanentNotificationError("invalid number")])
+    queue = make_queue(transport, max_retries=3)
+
+    queue.enqueue("Price Alert", "Mouse now $20", {"sms": RECIPIENT["sms"]}, channels=("sms",))
+    [result] = queue.flush()
+
+    assert len(transport.calls) == 1
+    assert result["status"]["sms"] == "[SMS Failed] invalid number"
+
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+def test_twilio_rate_limit_and_server_errors_are_retried(twilio_client, status):
+    client = twilio_client([TwilioRestException(status, "/Messages", msg="try again")])
+    queue = make_queue(TwilioTransport(), max_retries=2)
+
+    queue.enqueue("Price Alert", "Mouse now $20", {"sms": RECIPIENT["sms"]}, channels=("sms",))
+    [result] = queue.flush()
+
+    assert client.calls == 2
+    assert result["status"]["sms"] == "[✅ SMS Sent] SID: SM2"
+
+
+@pytest.mark.parametrize("status", [400, 401, 404])
+def test_twilio_client_errors_fail_without_retry(twilio_client, status):
+    client = twilio_client([TwilioRestException(status, "/Messages", msg="rejected")])
+    queue = make_queue(TwilioTransport(), max_retries=3)
+
+    queue.enqueue("Price Alert", "Mouse now $20", {"sms": RECIPIENT["sms"]}, channels=("sms",))
+    [result] = queue.flush()
+
+    assert client.calls == 1
+    assert result["status"]["sms"].startswith("[SMS Failed]")
+
+
+def test_missing_twilio_credentials_fail_without_retry(monkeypatch):
+    monkeypatch.setattr(email_notifier, "_client", None)
+    queue = make_queue(TwilioTransport(), max_retries=3)
+
+    queue.enqueue("Price Alert", "Mouse now $20", {"whatsapp": RECIPIENT["whatsapp"]}, channels=("whatsapp",))
+    [result] = queue.flush()
+
+    assert result["status"]["whatsapp"] == "[WHATSAPP Failed] Twilio credentials missing!"
@@ -2,7 +2,7 @@ import os
 from crewai.tools import BaseTool
 from typing import Dict, Callable, Optional
 from pydantic import Field
-from notifier.email_notifier import send_notification
+from notifier.notification_queue import get_notification_queue
 from agents.decision_logic import is_significant_change
 from dotenv import load_dotenv
 load_dotenv("api.env")
@@ -27,19 +27,23 @@ class NotifyTool(BaseTool):
     name: str = "NotifyTool"
     description: str = "Send alert via SMS and WhatsApp when product change detected."
 
-    def _run(self, scraped_data: Dict, recipient: Optional[Dict[str, str]] = None) -> Dict:
+    def _run(self, scraped_data: Dict, recipient: Optional[Dict[str, str]] = None, message: Optional[str] = None,
+             key: Optional[str] = None) -> Dict:
         try:
-            message = self.generate_message_fn(scraped_data)
+            if message is None:
+                message = self.generate_message_fn(scraped_data)
             if recipient is None:
                 recipient = self.default_recipient or {
                     "sms": os.getenv("CLIENT_PHONE_NO"),    # Use actual number from env
                     "whatsapp": os.getenv("CLIENT_WHATSAPP_NO")   # Use actual number from env
                 }
-            return send_notification(
+            # Alerts are batched per recipient and sent as one digest per window
+            return get_notification_queue().enqueue(
                 subject="Price Alert",
                 body=message,
                 channels=["sms", "whatsapp"],
-                recipient=recipient
+                recipient=recipient,
+                key=key or scraped_data.get("title")
             )
         except Exception as e:
             return {"status": "failed", "error": str(e)}
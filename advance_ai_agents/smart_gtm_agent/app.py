@@ -4,16 +4,16 @@ import re
 import streamlit as st
 
 from dotenv import load_dotenv
-from app.agents import save_to_db
+from app.agents import save_company_data
 from app.agents import (
-    run_smartcrawler,
-    run_searchscraper,
+    gather_company_data,
     research_agent,
     gtm_agent,
     channel_agent,
     fetch_all_data,
     fetch_reports_by_url,
-    assemble_cached_combined,
+    fetch_fresh_company_data,
+    format_company_data,
     extract_company_name,
 )
 
@@ -132,9 +132,10 @@ if run_analysis and company:
             "⚠️ Please select a valid feature (Research, Go-to-Market, or Channel) before running analysis."
         )
     else:
-        # Try using cached DB content first unless forced fresh
-        cached_combined = None if force_fresh else assemble_cached_combined(company)
-        if cached_combined:
+        # Try using cached DB content first unless forced fresh; only fresh, usable crawl + search pairs count
+        cached = None if force_fresh else fetch_fresh_company_data(company)
+        if cached:
+            cached_combined = format_company_data(*cached)
             st.info(
                 "Using cached results from database. Disable 'Force fresh run' to save costs."
             )
@@ -142,19 +143,17 @@ if run_analysis and company:
             text_output = cached_combined
             combined_context = cached_combined
         else:
-            # ---- Running SmartCrawler ----
-            with st.status("🕷️ Running SmartCrawler...") as status:
-                scrawler_result = run_smartcrawler(company)
+            # ---- Running SmartCrawler and SearchScraper concurrently ----
+            with st.status("🕷️🔍 Running SmartCrawler and SearchScraper...") as status:
+                scrawler_result, search_result = gather_company_data(company)
+                save_company_data(company, scrawler_result, search_result)
+                status.text("✅ SmartCrawler and SearchScraper completed! Saved to DB.")
+
+            with st.status("🕷️ SmartCrawler results", state="complete"):
                 st.markdown(scrawler_result, unsafe_allow_html=True)
-                status.text("✅ SmartCrawler completed! Saved to DB.")
-                save_to_db(company, "smartcrawler", scrawler_result)
 
-            # ---- Running SearchScraper ----
-            with st.status("🔍 Running SearchScraper...") as status:
-                search_result = run_searchscraper(company)
+            with st.status("🔍 SearchScraper results", state="complete"):
                 st.markdown(search_result, unsafe_allow_html=True)
-                status.text("✅ SearchScraper completed! Saved to DB.")
-                save_to_db(company, "searchscraper", search_result)
 
             text_output = scrawler_result + "\n\n" + search_result
             combined_context = text_output
@@ -1,15 +1,16 @@
 import os
 import json
-import sqlite3
-import time
-from typing import Dict, Any, List
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, List, Optional
 from dotenv import load_dotenv
-from scrapegraph_py import Client
+from scrapegraph_py import AsyncClient
 from langgraph.prebuilt import create_react_agent
 from langchain_nebius import ChatNebius
 from http.client import RemoteDisconnected
 from tenacity import retry, stop_after_attempt, wait_exponential
 from pydantic import SecretStr
+from app.report_store import REPORT_DB_FILE, REPORT_TTL, get_report_store
 
 load_dotenv("api.env")
 
@@ -21,31 +22,88 @@ if not SMARTCRAWLER_KEY or not NEBIUS_KEY:
         "SMARTCRAWLER_API_KEY and NEBIUS_API_KEY must be set in api.env"
     )
 
-sg_client = Client(api_key=SMARTCRAWLER_KEY)
 llm = ChatNebius(model="NousResearch/Hermes-4-70B", api_key=SecretStr(NEBIUS_KEY))
 
 
-@retry(stop=stop_after_attempt(2), wait=wait_exponential(multiplier=1, min=2, max=10))
-def run_smartcrawler(url: str) -> str:
-    """Simplified SmartCrawler request with doc-style polling and LLM summary"""
+# Crawl polling: first check after CRAWL_POLL_INITIAL seconds, doubling up to CRAWL_POLL_MAX
+CRAWL_POLL_INITIAL = 2.0
+CRAWL_POLL_MAX = 20.0
+CRAWL_TIMEOUT = 300.0
+
+CRAWL_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "Overview": {"type": "string"},
+        "Founders": {"type": "array"},
+        "Funding": {"type": "array"},
+        "Industry": {"type": "string"},
+        "Market Size": {"type": "string"},
+        "Competitors": {"type": "array"},
+    },
+}
+
+
+def run_sync(coro):
+    """Run a coroutine from sync code, even when the caller already has an event loop running."""
     try:
-        schema = {
-            "type": "object",
-            "properties": {
-                "Overview": {"type": "string"},
-                "Founders": {"type": "array"},
-                "Funding": {"type": "array"},
-                "Industry": {"type": "string"},
-                "Market Size": {"type": "string"},
-                "Competitors": {"type": "array"},
-            },
-        }
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+async def poll_crawl(
+    client: AsyncClient,
+    crawl_id: str,
+    timeout: float = CRAWL_TIMEOUT,
+    on_complete: Optional[Callable[[dict], None]] = None,
+) -> dict | None:
+    """Poll a crawl with exponential backoff until it succeeds or fails; None on timeout."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    delay = CRAWL_POLL_INITIAL
+    while True:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            return None
+        await asyncio.sleep(min(delay, remaining))
+        result = await client.get_crawl(crawl_id)
+        status = result.get("status")
+        if status == "failed" or (status == "success" and result.get("result")):
+            if on_complete:
+                on_complete(result)
+            return result
+        print(f"[Crawl] Status={status}, next check in {min(delay * 2, CRAWL_POLL_MAX):.0f}s")
+        delay = min(delay * 2, CRAWL_POLL_MAX)
+
+
+def crawl_markdown(result: dict) -> str:
+    pages = result["result"].get("pages", [])
+    if pages:
+        return "\n\n".join(
+            p.get(
+                "markdown",
+                json.dumps(p.get("content", {}), indent=2, ensure_ascii=False),
+            )
+            for p in pages
+        )
+    return json.dumps(result["result"], indent=2, ensure_ascii=False)
+
 
+@retry(stop=stop_after_attempt(2), wait=wait_exponential(multiplier=1, min=2, max=10))
+async def run_smartcrawler_async(
+    url: str,
+    client: AsyncClient,
+    on_complete: Optional[Callable[[dict], None]] = None,
+) -> str:
+    """SmartCrawler request with non-blocking polling and LLM summary"""
+    try:
         print(f"\n[Crawl] Starting for: {url}")
-        crawl_response = sg_client.crawl(
+        crawl_response = await client.crawl(
             url=url,
             prompt="Extract detailed company information",
-            data_schema=schema,
+            data_schema=CRAWL_SCHEMA,
             cache_website=True,
             depth=2,
             max_pages=5,
@@ -53,52 +111,41 @@ def run_smartcrawler(url: str) -> str:
         )
 
         crawl_id = crawl_response.get("id") or crawl_response.get("task_id")
-        if crawl_id:
-            print("[Crawl] Crawl started, polling for result...")
-            for i in range(60):
-                time.sleep(5)
-                result = sg_client.get_crawl(crawl_id)
-
-                print("[DEBUG] Full API Response:", json.dumps(result, indent=2))
-
-                status = result.get("status")
-                if status == "success" and result.get("result"):
-                    print("[Crawl] Completed successfully.")
-                    pages = result["result"].get("pages", [])
-                    if pages:
-                        markdown_content = "\n\n".join(
-                            p.get(
-                                "markdown",
-                                json.dumps(
-                                    p.get("content", {}), indent=2, ensure_ascii=False
-                                ),
-                            )
-                            for p in pages
-                        )
-                    else:
-                        markdown_content = json.dumps(
-                            result["result"], indent=2, ensure_ascii=False
-                        )
-                    # LLM summarize
-                    prompt = (
-                        "You are a precise company research assistant.\n"
-                        "Summarize the following data into structured company insights.\n"
-                        "Sections: Overview, Founders, Funding, Industry, Market Size, Competitors.\n\n"
-                        f"{markdown_content}"
-                    )
-                    return llm.invoke(prompt).content
-                elif status == "failed":
-                    return "Crawl failed."
-                print(f"[Crawl] Status={status}, waiting... ({5 * (i + 1)}s elapsed)")
-            return "Crawl timeout after 5 minutes."
-        else:
+        if not crawl_id:
             return "No crawl ID found, check URL or API key."
 
+        print("[Crawl] Crawl started, polling for result...")
+        result = await poll_crawl(client, crawl_id, on_complete=on_complete)
+        if result is None:
+            return "Crawl timeout after 5 minutes."
+        if result.get("status") == "failed":
+            return "Crawl failed."
+
+        print("[Crawl] Completed successfully.")
+        # LLM summarize
+        prompt = (
+            "You are a precise company research assistant.\n"
+            "Summarize the following data into structured company insights.\n"
+            "Sections: Overview, Founders, Funding, Industry, Market Size, Competitors.\n\n"
+            f"{crawl_markdown(result)}"
+        )
+        return (await llm.ainvoke(prompt)).content
+
     except Exception as e:
         print(f"[Crawl] Exception: {e}")
         return "Exception during crawling."
 
 
+def run_smartcrawler(url: str) -> str:
+    """Sync entry point for a single SmartCrawler run"""
+
+    async def _run():
+        async with AsyncClient(api_key=SMARTCRAWLER_KEY) as client:
+            return await run_smartcrawler_async(url, client)
+
+    return run_sync(_run())
+
+
 def extract_company_name(url: str) -> str:
     """URL se simple company name extract kare"""
     import re
@@ -109,11 +156,11 @@ def extract_company_name(url: str) -> str:
 
 
 @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
-def searchscraper_request(query: str, num_results: int = 5) -> dict:
+async def searchscraper_request(client: AsyncClient, query: str, num_results: int = 5) -> dict:
     """SearchScraper call with retry on connection failures"""
     try:
         print(f"\n[SearchScraper] Searching for: {query}")
-        resp = sg_client.searchscraper(user_prompt=query, num_results=num_results)
+        resp = await client.searchscraper(user_prompt=query, num_results=num_results)
         return resp
     except RemoteDisconnected:
         print("[SearchScraper] RemoteDisconnected, retrying...")
@@ -123,15 +170,11 @@ def searchscraper_request(query: str, num_results: int = 5) -> dict:
         raise
 
 
-def run_searchscraper(company_overview: str) -> str:
+async def run_searchscraper_async(
+    company_name: str, client: AsyncClient, company_url: Optional[str] = None
+) -> str:
     """Fetch competitor data with enhanced queries and better competitor analysis"""
 
-    # Extract company name from overview for better targeting
-    company_name_match = company_overview.split()[
-        :3
-    ]  # Take first few words as likely company name
-    company_name = " ".join(company_name_match)
-
     # Create multiple targeted queries for comprehensive competitor research
     queries = [
         f"{company_name} competitors direct rivals and similar companies",
@@ -141,13 +184,21 @@ def run_searchscraper(company_overview: str) -> str:
     all_results = []
 
     try:
-        # Run multiple queries to get comprehensive competitor data
-        for query in queries:
-            raw_resp = searchscraper_request(query)
-            if raw_resp and raw_resp.get("result"):
+        # Run the queries concurrently; one failing query must not discard the other's results
+        responses = await asyncio.gather(
+            *(searchscraper_request(client, query) for query in queries),
+            return_exceptions=True,
+        )
+        failures = [resp for resp in responses if isinstance(resp, BaseException)]
+        for failure in failures:
+            print(f"[SearchScraper] Query failed: {failure}")
+        for raw_resp in responses:
+            if isinstance(raw_resp, dict) and raw_resp.get("result"):
                 all_results.append(raw_resp["result"])
 
         if not all_results:
+            if len(failures) == len(queries):
+                return "Error fetching competitor data."
             return "No competitor data found."
 
         # Combine all search results - convert dictionaries to strings
@@ -197,11 +248,14 @@ def run_searchscraper(company_overview: str) -> str:
             "- Use 'Not available' only if truly no data exists\n"
             "- Prioritize companies that target similar customers with competing solutions\n"
             "- Focus on actionable competitive intelligence\n\n"
-            f"COMPANY BEING ANALYZED:\n{company_overview}\n\n"
+            f"COMPANY BEING ANALYZED: {company_name}"
+            + (f" ({company_url})" if company_url else "")
+            + "\nOnly the company's name and website are given; identify it from the search results "
+            "and do not list it as its own competitor.\n\n"
             f"SEARCH RESULTS TO ANALYZE:\n{combined_data}"
         )
 
-        result = llm.invoke(prompt).content
+        result = (await llm.ainvoke(prompt)).content
 
         # Ensure result is always a string
         if isinstance(result, list):
@@ -227,79 +281,116 @@ def run_searchscraper(company_overview: str) -> str:
         return "Error fetching competitor data."
 
 
-def save_to_db(url: str, feature: str, content: str, db_path="company_data.db"):
+def run_searchscraper(company_name: str, company_url: Optional[str] = None) -> str:
+    """Sync entry point for a single competitor search"""
+
+    async def _run():
+        async with AsyncClient(api_key=SMARTCRAWLER_KEY) as client:
+            return await run_searchscraper_async(company_name, client, company_url)
+
+    return run_sync(_run())
+
+
+async def gather_company_data_async(
+    url: str, on_crawl_complete: Optional[Callable[[dict], None]] = None
+) -> tuple[str, str]:
+    """
+    Run SmartCrawler and both SearchScraper queries concurrently.
+    The competitor search is keyed on the company name from the URL, so it no longer waits for the crawl.
+    """
+    async with AsyncClient(api_key=SMARTCRAWLER_KEY) as client:
+        return await asyncio.gather(
+            run_smartcrawler_async(url, client, on_complete=on_crawl_complete),
+            run_searchscraper_async(extract_company_name(url), client, company_url=url),
+        )
+
+
+def gather_company_data(
+    url: str, on_crawl_complete: Optional[Callable[[dict], None]] = None
+) -> tuple[str, str]:
+    """Returns (smartcrawler_data, searchscraper_data); total time is the slower of the two."""
+    sc_data, ss_data = run_sync(gather_company_data_async(url, on_crawl_complete))
+    return sc_data, ss_data
+
+
+# Placeholder results returned when a crawl or search fails; never served from the cache
+FAILED_RESULTS = {
+    "No crawl ID found, check URL or API key.",
+    "Crawl timeout after 5 minutes.",
+    "Crawl failed.",
+    "Exception during crawling.",
+    "No competitor data found.",
+    "Error fetching competitor data.",
+}
+
+
+def is_usable_result(content: str) -> bool:
+    return bool(content and content.strip()) and content not in FAILED_RESULTS and not content.startswith("❌")
+
+
+def save_to_db(url: str, feature: str, content: str, db_path=REPORT_DB_FILE):
     if not content.strip():
         content = "No content generated."
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS reports (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            url TEXT,
-            feature TEXT,
-            content TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    cursor.execute(
-        "INSERT INTO reports (url, feature, content) VALUES (?, ?, ?)",
-        (url, feature, content),
-    )
-    conn.commit()
-    conn.close()
+    get_report_store(db_path).save(url, feature, content)
     print(f"[DB] Saved report for {url}, feature={feature}")
 
 
-def fetch_all_data(db_path="company_data.db") -> List[tuple]:
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    cursor.execute("SELECT id, url, feature, created_at FROM reports ORDER BY id DESC")
-    rows = cursor.fetchall()
-    conn.close()
-    return rows
+def save_company_data(url: str, sc_data: str, ss_data: str, db_path=REPORT_DB_FILE):
+    """Store the crawl and search results separately so later runs can reuse them."""
+    if is_usable_result(sc_data):
+        save_to_db(url, "smartcrawler", sc_data, db_path=db_path)
+    if is_usable_result(ss_data):
+        save_to_db(url, "searchscraper", ss_data, db_path=db_path)
+
+
+def fetch_all_data(db_path=REPORT_DB_FILE) -> List[tuple]:
+    return get_report_store(db_path).all_reports()
 
 
 def fetch_reports_by_url(
-    url: str, limit: int = 5, db_path: str = "company_data.db"
+    url: str, limit: int = 5, db_path: str = REPORT_DB_FILE
 ) -> List[tuple]:
     """Return recent reports for a URL including content.
 
     Returns tuples: (id, url, feature, content, created_at)
     """
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    cursor.execute(
-        "SELECT id, url, feature, content, created_at FROM reports WHERE url = ? ORDER BY id DESC LIMIT ?",
-        (url, limit),
-    )
-    rows = cursor.fetchall()
-    conn.close()
-    return rows
+    return get_report_store(db_path).reports_by_url(url, limit)
 
 
 def fetch_latest_by_feature(
-    url: str, feature: str, db_path: str = "company_data.db"
+    url: str, feature: str, db_path: str = REPORT_DB_FILE, max_age: int | None = None
 ) -> str | None:
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    cursor.execute(
-        "SELECT content FROM reports WHERE url = ? AND feature = ? ORDER BY id DESC LIMIT 1",
-        (url, feature),
-    )
-    row = cursor.fetchone()
-    conn.close()
-    return row[0] if row else None
+    """Latest content for (url, feature); with max_age (seconds), only if it is still fresh."""
+    return get_report_store(db_path).latest(url, feature, max_age=max_age)
+
+
+def fetch_fresh_company_data(
+    url: str, db_path: str = REPORT_DB_FILE, max_age: int = REPORT_TTL
+) -> tuple[str, str] | None:
+    """(smartcrawler, searchscraper) content if both were stored within max_age seconds, else None."""
+    sc = fetch_latest_by_feature(url, "smartcrawler", db_path=db_path, max_age=max_age)
+    ss = fetch_latest_by_feature(url, "searchscraper", db_path=db_path, max_age=max_age)
+    if sc and ss and is_usable_result(sc) and is_usable_result(ss):
+        return sc, ss
+    return None
+
 
+def format_company_data(sc_data: str, ss_data: str) -> str:
+    return f"## 🕷️ Crawler Data:\n{sc_data}\n\n## 🔍 Scraper Data:\n{ss_data}"
 
-def assemble_cached_combined(url: str, db_path: str = "company_data.db") -> str | None:
-    """Try to combine latest SmartCrawler + SearchScraper content from DB for given URL.
 
+def assemble_cached_combined(
+    url: str, db_path: str = REPORT_DB_FILE, max_age: int | None = REPORT_TTL
+) -> str | None:
+    """Try to combine latest fresh SmartCrawler + SearchScraper content from DB for given URL.
+
+    Only content saved within max_age seconds is used (pass None to ignore age).
     Returns combined markdown string if both exist; if only one exists, returns that one; otherwise None.
     """
-    sc = fetch_latest_by_feature(url, "smartcrawler", db_path=db_path)
-    ss = fetch_latest_by_feature(url, "searchscraper", db_path=db_path)
+    sc = fetch_latest_by_feature(url, "smartcrawler", db_path=db_path, max_age=max_age)
+    ss = fetch_latest_by_feature(url, "searchscraper", db_path=db_path, max_age=max_age)
     if sc and ss:
-        return f"## 🕷️ Crawler Data:\n{sc}\n\n## 🔍 Scraper Data:\n{ss}"
+        return format_company_data(sc, ss)
     if sc:
         return f"## 🕷️ Crawler Data:\n{sc}"
     if ss:
@@ -321,15 +412,15 @@ def company_market_tool(url: str, feature: str = "research") -> str:
     Returns:
         str: Combined report from SmartCrawler and SearchScraper.
     """
-    sc_data = run_smartcrawler(url)
+    # Serve recently stored crawl + search results instead of re-crawling
+    cached = fetch_fresh_company_data(url)
+    if cached:
+        print(f"[Cache] Using stored SmartCrawler + SearchScraper data for {url}")
+        return format_company_data(*cached)
+
+    sc_data, ss_data = gather_company_data(url)
+    save_company_data(url, sc_data, ss_data)
     sc_content = f"## 🕷️ Crawler Data:\n{sc_data}"
-
-    # Extract overview (first paragraph)
-    overview_lines = sc_data.splitlines()
-    company_overview = " ".join(overview_lines[:2]) if overview_lines else url
-
-    # Use overview for searchscraper
-    ss_data = run_searchscraper(company_overview)
     ss_content = f"\n## 🔍 Scraper Data:\n{ss_data}"
 
     full_content = sc_content + ss_content
@@ -420,20 +511,20 @@ def report_agent(state: Dict[str, Any]) -> Dict[str, Any]:
     return state
 
 
-def generate_full_company_report(url: str) -> str:
-    smartcrawler_data = run_smartcrawler(url)
-    print(f"[Report] SmartCrawler done for {url}")
-
-    try:
-        overview_lines = smartcrawler_data.splitlines()
-        company_name = overview_lines[0] if overview_lines else url
-        query = f"Companies similar to {company_name} in the same industry"
-    except Exception as e:
-        print(f"[Report] Error extracting company name: {e}")
-        query = f"Companies similar to {url}"
-
-    searchscraper_data = run_searchscraper(query)
-    print(f"[Report] SearchScraper done for query: {query}")
+def generate_full_company_report(url: str, force_fresh: bool = False) -> str:
+    cached = None if force_fresh else fetch_fresh_company_data(url)
+    if cached:
+        smartcrawler_data, searchscraper_data = cached
+        print(f"[Report] Using stored SmartCrawler + SearchScraper data for {url}")
+    else:
+        smartcrawler_data, searchscraper_data = gather_company_data(
+            url,
+            on_crawl_complete=lambda result: print(
+                f"[Report] SmartCrawler finished for {url} (status={result.get('status')})"
+            ),
+        )
+        save_company_data(url, smartcrawler_data, searchscraper_data)
+        print(f"[Report] SmartCrawler and SearchScraper done for {url}")
 
     full_report = (
         f"### Company Research Report for {url}\n\n"
@@ -0,0 +1,83 @@
+import os
+import sqlite3
+import threading
+from typing import List, Optional
+
+REPORT_DB_FILE = "company_data.db"
+# Stored crawl/search results younger than this are served instead of calling the APIs again
+REPORT_TTL = int(os.getenv("REPORT_TTL_SECONDS", str(24 * 60 * 60)))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT,
+    feature TEXT,
+    content TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_reports_url_feature ON reports (url, feature, id);
+"""
+
+
+class ReportStore:
+    """
+    Report history in SQLite (WAL mode).
+    The schema is created once per database; each thread reuses its own connection.
+    """
+
+    def __init__(self, db_path: str = REPORT_DB_FILE):
+        self.db_path = db_path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def save(self, url: str, feature: str, content: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO reports (url, feature, content) VALUES (?, ?, ?)",
+                (url, feature, content),
+            )
+
+    def all_reports(self) -> List[tuple]:
+        return self._connect().execute(
+            "SELECT id, url, feature, created_at FROM reports ORDER BY id DESC"
+        ).fetchall()
+
+    def reports_by_url(self, url: str, limit: int = 5) -> List[tuple]:
+        return self._connect().execute(
+            "SELECT id, url, feature, content, created_at FROM reports WHERE url = ? ORDER BY id DESC LIMIT ?",
+            (url, limit),
+        ).fetchall()
+
+    def latest(self, url: str, feature: str, max_age: Optional[int] = None) -> Optional[str]:
+        """Latest content for (url, feature); with max_age, only if saved within that many seconds."""
+        query = "SELECT content FROM reports WHERE url = ? AND feature = ?"
+        params: list = [url, feature]
+        if max_age is not None:
+            # created_at is CURRENT_TIMESTAMP, i.e. UTC 'YYYY-MM-DD HH:MM:SS'
+            query += " AND created_at >= datetime('now', ?)"
+            params.append(f"-{int(max_age)} seconds")
+        row = self._connect().execute(query + " ORDER BY id DESC LIMIT 1", params).fetchone()
+        return row[0] if row else None
+
+
+_stores: dict = {}
+_stores_lock = threading.Lock()
+
+
+def get_report_store(db_path: str = REPORT_DB_FILE) -> ReportStore:
+    """Process-wide store per database file, created on first use."""
+    with _stores_lock:
+        store = _stores.get(db_path)
+        if store is None:
+            store = _stores[db_path] = ReportStore(db_path)
+        return store
@@ -1,5 +1,11 @@
 import os
 import shutil
+import json
+import hashlib
+import http.client
+import logging
+import urllib.error
+import urllib.request
 from tkinter.ttk import Style
 from turtle import width
 from typing import Iterator
@@ -33,29 +39,133 @@ tracer_provider = register(
 st.set_page_config(page_title="Agentic RAG", layout="wide")
 
 
-def load_knowledge_base(urls: list[str] = None):
+logger = logging.getLogger(__name__)
+
+LANCEDB_URI = "tmp/lancedb"
+# Per-table record of each loaded URL's ETag, Last-Modified and content hash
+KB_MANIFEST_FILE = os.path.join(LANCEDB_URI, "kb_manifest.json")
+
+
+def knowledge_base_table(urls: list[str]) -> str:
+    """One LanceDB table per URL set, so switching between sets never re-embeds either."""
+    key = hashlib.sha256("\n".join(sorted(urls)).encode("utf-8")).hexdigest()[:16]
+    return f"kb-{key}"
+
+
+def get_knowledge_base(urls: list[str] = None) -> UrlKnowledge:
     """
-    Returns the knowledge base for the agent.
-    This function is used to load the knowledge base from a URL.
+    Returns the knowledge base for the agent without fetching or embedding anything.
     """
-    knowledge_base = UrlKnowledge(
-        urls=urls or [],
+    urls = urls or []
+    return UrlKnowledge(
+        urls=urls,
         vector_db=LanceDb(
-            table_name="mcp-docs-knowledge-base",
-            uri="tmp/lancedb",
+            table_name=knowledge_base_table(urls),
+            uri=LANCEDB_URI,
             search_type=SearchType.vector,
             embedder=OpenAIEmbedder(id="text-embedding-3-small"),
         ),
     )
-    knowledge_base.load()
+
+
+def read_manifest() -> dict:
+    if os.path.exists(KB_MANIFEST_FILE):
+        try:
+            with open(KB_MANIFEST_FILE, "r") as f:
+                return json.load(f)
+        except json.JSONDecodeError:
+            return {}
+    return {}
+
+
+def write_manifest(manifest: dict) -> None:
+    os.makedirs(os.path.dirname(KB_MANIFEST_FILE), exist_ok=True)
+    tmp_path = f"{KB_MANIFEST_FILE}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, KB_MANIFEST_FILE)
+
+
+def check_url(url: str, previous: dict) -> tuple[bool, dict]:
+    """
+    Conditional GET against the previously seen ETag / Last-Modified.
+    Returns (changed, state); a 304 or an identical body hash counts as unchanged.
+    """
+    request = urllib.request.Request(url, headers={"User-Agent": "agentic-rag"})
+    if previous.get("etag"):
+        request.add_header("If-None-Match", previous["etag"])
+    if previous.get("last_modified"):
+        request.add_header("If-Modified-Since", previous["last_modified"])
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            body = response.read()
+            state = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "content_hash": hashlib.sha256(body).hexdigest(),
+            }
+    except urllib.error.HTTPError as e:
+        if e.code == 304 and previous:
+            return False, previous
+        raise
+    return state["content_hash"] != previous.get("content_hash"), state
+
+
+def delete_url_documents(vector_db: LanceDb, url: str) -> None:
+    """Remove every chunk that was loaded from a URL before re-loading its new content."""
+    if vector_db.table is None:
+        return
+    # Full scan: a query builder (table.search()) only returns its default 10 rows
+    rows = vector_db.table.to_pandas()
+    stale_ids = [
+        row_id
+        for row_id, payload in zip(rows["id"], rows["payload"])
+        if (json.loads(payload).get("meta_data") or {}).get("url") == url
+    ]
+    if stale_ids:
+        id_list = ", ".join(f"'{row_id}'" for row_id in stale_ids)
+        vector_db.table.delete(f"id IN ({id_list})")
+
+
+def load_knowledge_base(urls: list[str] = None) -> UrlKnowledge:
+    """
+    Returns the knowledge base for the agent, fetching and embedding only new or changed URLs.
+    The vector DB persists on disk, so after a restart unchanged URLs cost one conditional request each.
+    """
+    knowledge_base = get_knowledge_base(urls)
+    vector_db = knowledge_base.vector_db
+
+    manifest = read_manifest()
+    # An empty table means the manifest entries are stale (e.g. the table was dropped)
+    table_manifest = manifest.get(vector_db.table_name, {}) if vector_db.get_count() else {}
+    changed_urls = []
+    for url in knowledge_base.urls:
+        previous = table_manifest.get(url, {})
+        try:
+            changed, state = check_url(url, previous)
+        except (OSError, ValueError, http.client.HTTPException) as e:
+            # Unreachable or invalid URL: keep its existing chunks and manifest entry and carry on with the rest
+            logger.warning("Could not check %s, keeping its previous state: %s", url, e)
+            continue
+        if changed:
+            if previous:
+                delete_url_documents(vector_db, url)
+            changed_urls.append(url)
+        table_manifest[url] = state
+
+    if changed_urls:
+        UrlKnowledge(urls=changed_urls, vector_db=vector_db).load()
+
+    manifest[vector_db.table_name] = table_manifest
+    write_manifest(manifest)
     return knowledge_base
 
 
-# Load the knowledge base: Comment after first run as the knowledge base is already loaded
 def agentic_rag_response(
     urls: list[str] = None, query: str = ""
 ) -> Iterator[RunResponseEvent]:
-    knowledge_base = load_knowledge_base(urls)
+    # The knowledge base was loaded with the "Load Knowledge Base" button; only search it here
+    knowledge_base = get_knowledge_base(urls)
 
     agent = Agent(
         model=OpenAIChat(id="gpt-5-2025-08-07"),
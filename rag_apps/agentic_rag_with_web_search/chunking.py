@@ -0,0 +1,79 @@
+import os
+import re
+import tiktoken
+
+# Target chunk size and overlap, in embedding-model tokens
+CHUNK_TOKENS = int(os.getenv("CHUNK_TOKENS", "400"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "60"))
+
+# text-embedding-3-* models use the cl100k_base tokenizer
+_encoding = tiktoken.get_encoding("cl100k_base")
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(\[])|\n{2,}")
+
+
+def count_tokens(text):
+    return len(_encoding.encode(text))
+
+
+def split_sentences(text):
+    return [sentence.strip() for sentence in _SENTENCE_END.split(text) if sentence and sentence.strip()]
+
+
+def _split_long_sentence(sentence, max_tokens):
+    """Hard-split a sentence that is longer than a whole chunk into token windows."""
+    tokens = _encoding.encode(sentence)
+    return [_encoding.decode(tokens[start:start + max_tokens]) for start in range(0, len(tokens), max_tokens)]
+
+
+def chunk_pages(pages, chunk_tokens=CHUNK_TOKENS, overlap_tokens=CHUNK_OVERLAP_TOKENS):
+    """
+    Split page texts into sentence-aligned chunks of about chunk_tokens tokens.
+
+    Chunks may span page boundaries; each one records the first and last page it covers
+    (1-based). Consecutive chunks share up to overlap_tokens tokens of trailing sentences,
+    fewer when the overlap plus the next sentence would exceed chunk_tokens.
+    Returns a list of {"text", "page_start", "page_end", "tokens"} dicts.
+    """
+    sentences = []  # (sentence, page_number, token_count)
+    for page_number, page_text in enumerate(pages, start=1):
+        for sentence in split_sentences(page_text):
+            token_count = count_tokens(sentence)
+            if token_count > chunk_tokens:
+                for part in _split_long_sentence(sentence, chunk_tokens):
+                    sentences.append((part, page_number, count_tokens(part)))
+            else:
+                sentences.append((sentence, page_number, token_count))
+
+    chunks = []
+    window = []
+    window_tokens = 0
+
+    def emit():
+        chunks.append({
+            "text": " ".join(sentence for sentence, _, _ in window),
+            "page_start": window[0][1],
+            "page_end": window[-1][1],
+            "tokens": window_tokens,
+        })
+
+    for sentence in sentences:
+        if window and window_tokens + sentence[2] > chunk_tokens:
+            emit()
+            # Carry trailing sentences over as overlap, leaving room for the next sentence
+            overlap_budget = min(overlap_tokens, chunk_tokens - sentence[2])
+            overlap = []
+            overlap_size = 0
+            for previous in reversed(window):
+                if overlap_size + previous[2] > overlap_budget:
+                    break
+                overlap.insert(0, previous)
+                overlap_size += previous[2]
+            window, window_tokens = overlap, overlap_size
+        window.append(sentence)
+        window_tokens += sentence[2]
+
+    # The window always ends with a sentence that has not been emitted yet
+    if window:
+        emit()
+    return chunks
@@ -1,12 +1,24 @@
 from operator import le
 import os
 import uuid
+import hashlib
 import pdfplumber
 from openai import OpenAI
 from dotenv import load_dotenv
 from crewai_tools import QdrantVectorSearchTool
 from qdrant_client import QdrantClient
-from qdrant_client.models import PointStruct, Distance, VectorParams
+from qdrant_client.models import (
+    PointStruct,
+    Distance,
+    VectorParams,
+    Filter,
+    FilterSelector,
+    HasIdCondition,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+)
+from chunking import chunk_pages
 
 # Load environment variables
 load_dotenv()
@@ -21,53 +33,137 @@ qdrant = QdrantClient(
 
 collection_name = os.getenv("QDRANT_COLLECTION_NAME", "rag_with_web_search")
 
-# Extract text from PDF
+# Extract text from PDF, one entry per page (empty string for pages without text)
 def extract_text_from_pdf(pdf_path):
     text = []
     with pdfplumber.open(pdf_path) as pdf:
         for page in pdf.pages:
             page_text = page.extract_text()
-            if page_text:
-                text.append(page_text.strip())
+            text.append(page_text.strip() if page_text else "")
     return text
 
-# Generate OpenAI embeddings
-def get_openai_embedding(text):
+EMBEDDING_MODEL = "text-embedding-3-large"
+EMBEDDING_SIZE = 3072
+# Inputs per embeddings request and points per Qdrant upsert
+EMBED_BATCH_SIZE = 64
+RETRIEVE_BATCH_SIZE = 256
+
+# int8 scalar quantization keeps the quantized vectors in RAM (4x smaller than float32);
+# the original vectors stay on disk and are used to rescore the top candidates
+QUANTIZATION_CONFIG = ScalarQuantization(
+    scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+)
+
+# Namespace for deterministic point ids derived from document and chunk content
+POINT_ID_NAMESPACE = uuid.UUID("5b0e6c1e-8d57-4a53-9d0c-0c2f3c1b7a41")
+
+# Generate OpenAI embeddings for a batch of texts in one request
+def get_openai_embeddings(texts):
     response = client.embeddings.create(
-        input=text,
-        model="text-embedding-3-large"
+        input=texts,
+        model=EMBEDDING_MODEL
     )
-    # print(f"Generated embedding for text: {text[:30]}...")
-    print(f"Generated embedding: {response.data[0].embedding[:30]}...")
+    return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+# Generate OpenAI embeddings
+def get_openai_embedding(text):
+    return get_openai_embeddings([text])[0]
+
+def document_hash(pdf_path):
+    digest = hashlib.sha256()
+    with open(pdf_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
 
-    print(f"the length is: {len(response.data[0].embedding)}")
-    return response.data[0].embedding
+def content_point_id(doc_hash, text):
+    """
+    The same chunk of the same document always maps to the same point id, so re-loading a PDF
+    is an idempotent upsert; identical text in two different PDFs gets two points.
+    """
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return str(uuid.uuid5(POINT_ID_NAMESPACE, f"{doc_hash}:{digest}"))
+
+def ensure_collection():
+    if not qdrant.collection_exists(collection_name):
+        qdrant.create_collection(
+            collection_name=collection_name,
+            vectors_config=VectorParams(size=EMBEDDING_SIZE, distance=Distance.COSINE, on_disk=True),
+            quantization_config=QUANTIZATION_CONFIG
+        )
+    elif qdrant.get_collection(collection_name).config.quantization_config is None:
+        # Collections created before quantization was enabled are upgraded in place
+        qdrant.update_collection(collection_name=collection_name, quantization_config=QUANTIZATION_CONFIG)
+
+def batched(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def remove_stale_points(keep_ids):
+    """
+    Delete every point except keep_ids: chunks of previously uploaded PDFs, of older versions
+    of this PDF and points written by earlier chunking schemes. The search tool queries the
+    whole collection, so it must only hold the current document.
+    """
+    selector = Filter(must_not=[HasIdCondition(has_id=list(keep_ids))]) if keep_ids else Filter()
+    qdrant.delete(collection_name=collection_name, points_selector=FilterSelector(filter=selector), wait=True)
+
+def existing_point_ids(point_ids):
+    existing = set()
+    for batch in batched(point_ids, RETRIEVE_BATCH_SIZE):
+        points = qdrant.retrieve(collection_name=collection_name, ids=batch, with_payload=False, with_vectors=False)
+        existing.update(str(point.id) for point in points)
+    return existing
 
 # Store text and embeddings in Qdrant
 def load_pdf_to_qdrant(pdf_path):
+    """
+    Split the PDF into sentence-aligned token windows and embed and upsert only the chunks
+    that are not in the collection yet. Points of any other document are removed first.
+    Each payload records the source file, document hash and page range.
+    Chunks are embedded in batches and each batch is upserted as soon as it is ready.
+    Returns the number of newly embedded chunks.
+    """
     if not os.path.exists(pdf_path):
         raise FileNotFoundError(f"PDF file not found: {pdf_path}")
-    # Extract text from PDF
-    text_chunks = extract_text_from_pdf(pdf_path)
-    
-    # Create Qdrant collection
-    if qdrant.collection_exists(collection_name):
-        qdrant.delete_collection(collection_name)
-    qdrant.create_collection(
-        collection_name=collection_name,
-        vectors_config=VectorParams(size=3072, distance=Distance.COSINE)
-    )
+    # Extract text from PDF and chunk it across page boundaries
+    text_chunks = chunk_pages(extract_text_from_pdf(pdf_path))
+    source = os.path.basename(pdf_path)
+    doc_hash = document_hash(pdf_path)
+
+    ensure_collection()
+
+    chunks_by_id = {content_point_id(doc_hash, chunk["text"]): chunk for chunk in text_chunks}
+    remove_stale_points(chunks_by_id)
+    existing = existing_point_ids(list(chunks_by_id))
+    new_chunks = [(point_id, chunk) for point_id, chunk in chunks_by_id.items() if point_id not in existing]
+    print(f"{len(new_chunks)} new of {len(chunks_by_id)} chunks to embed")
 
-    # Store embeddings
-    points = []
-    for chunk in text_chunks:
-        embedding = get_openai_embedding(chunk)
-        points.append(PointStruct(
-            id=str(uuid.uuid4()),
-            vector=embedding,
-            payload={"text": chunk}
-        ))
-    qdrant.upsert(collection_name=collection_name, points=points)
+    batches = list(batched(new_chunks, EMBED_BATCH_SIZE))
+    for i, batch in enumerate(batches):
+        embeddings = get_openai_embeddings([chunk["text"] for _, chunk in batch])
+        qdrant.upsert(
+            collection_name=collection_name,
+            points=[
+                PointStruct(
+                    id=point_id,
+                    vector=embedding,
+                    payload={
+                        "text": chunk["text"],
+                        "metadata": {
+                            "source": source,
+                            "document_hash": doc_hash,
+                            "page_start": chunk["page_start"],
+                            "page_end": chunk["page_end"],
+                        },
+                    },
+                )
+                for (point_id, chunk), embedding in zip(batch, embeddings)
+            ],
+            # Don't block on intermediate batches; waiting on the last one makes all of them visible
+            wait=i == len(batches) - 1,
+        )
+    return len(new_chunks)
 
 def get_qdrant_tool():
     try:
@@ -1,6 +1,8 @@
 import streamlit as st
 import os
-from llama_index.core import Settings, VectorStoreIndex, PromptTemplate
+import shutil
+import requests
+from llama_index.core import Settings, VectorStoreIndex, PromptTemplate, StorageContext, load_index_from_storage
 from llama_index.embeddings.nebius import NebiusEmbedding
 from llama_index.llms.nebius import NebiusLLM
 from llama_index.readers.github import GithubRepositoryReader, GithubClient
@@ -10,6 +12,9 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+# Persisted indexes live under INDEX_DIR/<owner>/<repo>/<branch>/<commit sha>
+INDEX_DIR = ".code_index"
+
 def parse_github_url(url):
     pattern = r"https?://github\.com/([^/]+)/([^/]+)(?:/tree/([^/]+))?"
     match = re.match(pattern, url)
@@ -18,7 +23,6 @@ def parse_github_url(url):
     owner, repo, branch = match.groups()
     return owner, repo, branch if branch else "main"
 
-@st.cache_resource
 def load_github_data(github_token, owner, repo, branch="main"):
     github_client = GithubClient(github_token)
     loader = GithubRepositoryReader(
@@ -32,23 +36,69 @@ def load_github_data(github_token, owner, repo, branch="main"):
         verbose=False,
         concurrent_requests=5,
     )
-    return loader.load_data(branch=branch)
+    docs = loader.load_data(branch=branch)
+    # Key documents by path so a new commit only re-embeds the files that changed
+    for doc in docs:
+        doc.id_ = doc.metadata.get("file_path", doc.id_)
+    return docs
+
+def get_commit_sha(github_token, owner, repo, branch):
+    response = requests.get(
+        f"https://api.github.com/repos/{owner}/{repo}/commits/{branch}",
+        headers={"Authorization": f"Bearer {github_token}", "Accept": "application/vnd.github+json"},
+        timeout=30,
+    )
+    response.raise_for_status()
+    return response.json()["sha"]
 
-def run_rag_completion(query_text: str, docs) -> str:
-    llm = NebiusLLM(
+def configure_models():
+    Settings.llm = NebiusLLM(
         model="deepseek-ai/DeepSeek-V3",
         api_key=os.getenv("NEBIUS_API_KEY")
     )
-
-    embed_model = NebiusEmbedding(
+    Settings.embed_model = NebiusEmbedding(
         model_name="BAAI/bge-en-icl",
         api_key=os.getenv("NEBIUS_API_KEY")
     )
-    
-    Settings.llm = llm
-    Settings.embed_model = embed_model
 
-    index = VectorStoreIndex.from_documents(docs)
+def latest_persisted_index(owner, repo, branch):
+    branch_dir = os.path.join(INDEX_DIR, owner, repo, branch)
+    if not os.path.isdir(branch_dir):
+        return None
+    dirs = [os.path.join(branch_dir, d) for d in os.listdir(branch_dir)]
+    dirs = [d for d in dirs if os.path.isdir(d)]
+    return max(dirs, key=os.path.getmtime) if dirs else None
+
+@st.cache_resource(show_spinner=False)
+def load_code_index(github_token, owner, repo, branch, sha):
+    """
+    Load the index for a commit from disk, or build it. When an index for an older commit
+    of the same branch exists, it is updated in place so only changed files are re-embedded.
+    """
+    configure_models()
+    persist_dir = os.path.join(INDEX_DIR, owner, repo, branch, sha)
+    if os.path.exists(persist_dir):
+        return load_index_from_storage(StorageContext.from_defaults(persist_dir=persist_dir))
+
+    docs = load_github_data(github_token, owner, repo, branch)
+    previous_dir = latest_persisted_index(owner, repo, branch)
+    if previous_dir:
+        index = load_index_from_storage(StorageContext.from_defaults(persist_dir=previous_dir))
+        index.refresh_ref_docs(docs)
+        current_ids = {doc.id_ for doc in docs}
+        for ref_doc_id in set(index.ref_doc_info) - current_ids:
+            index.delete_ref_doc(ref_doc_id, delete_from_docstore=True)
+    else:
+        index = VectorStoreIndex.from_documents(docs)
+
+    index.storage_context.persist(persist_dir=persist_dir)
+    if previous_dir:
+        shutil.rmtree(previous_dir, ignore_errors=True)
+    return index
+
+def run_rag_completion(query_text: str, index) -> str:
+    configure_models()
+
     query_engine = index.as_query_engine(similarity_top_k=5, streaming=True)
 
     qa_prompt_tmpl = PromptTemplate(
@@ -82,8 +132,8 @@ def main():
     # Initialize session states
     if "messages" not in st.session_state:
         st.session_state.messages = []
-    if "docs" not in st.session_state:
-        st.session_state.docs = None
+    if "index" not in st.session_state:
+        st.session_state.index = None
     
     # Header with title and buttons
     col1, col2, col5, col3, col4 = st.columns([3, 1, 1, 1, 1])
@@ -122,7 +172,8 @@ def main():
                     
                     owner, repo, branch = parse_github_url(repo_url)
                     with st.spinner("Loading repository..."):
-                        st.session_state.docs = load_github_data(github_token, owner, repo, branch)
+                        sha = get_commit_sha(github_token, owner, repo, branch)
+                        st.session_state.index = load_code_index(github_token, owner, repo, branch, sha)
                     st.success("✓ Repository loaded successfully")
                 except Exception as e:
                     st.error(f"Error: {str(e)}")
@@ -134,7 +185,7 @@ def main():
     
     # Chat input
     if prompt := st.chat_input("Ask about the repository..."):
-        if not st.session_state.docs:
+        if st.session_state.index is None:
             st.error("Please load a repository first")
             st.stop()
         
@@ -147,7 +198,7 @@ def main():
         with st.chat_message("assistant"):
             with st.spinner("Thinking..."):
                 try:
-                    response = run_rag_completion(prompt, st.session_state.docs)
+                    response = run_rag_completion(prompt, st.session_state.index)
                     st.markdown(response)
                     st.session_state.messages.append({"role": "assistant", "content": response})
                     download_response(response)
@@ -14,7 +14,7 @@ import base64
 import os
 import tempfile
 from PIL import Image
-import fitz  # PyMuPDF for PDF to image
+from ocr_pipeline import ocr_image, ocr_pages, rasterize_pdf
 
 load_dotenv()
 
@@ -101,100 +101,29 @@ with st.sidebar:
             api_key=api_key or os.environ.get("NEBIUS_API_KEY"),
         )
         if file_type in ["image/png", "image/jpeg", "image/jpg"]:
-            b64_data = base64.b64encode(file_bytes).decode()
-            mime = file_type
             with st.spinner("Extracting text from image..."):
                 try:
-                    response = client.chat.completions.create(
-                        model="google/gemma-3-27b-it",
-                        max_tokens=512,
-                        temperature=0.5,
-                        top_p=0.9,
-                        extra_body={"top_k": 50},
-                        messages=[
-                            {
-                                "role": "user",
-                                "content": [
-                                    {
-                                        "type": "text",
-                                        "text": "Extract the Details and use Tables where applicable",
-                                    },
-                                    {
-                                        "type": "image_url",
-                                        "image_url": {
-                                            "url": f"data:{mime};base64,{b64_data}"
-                                        },
-                                    },
-                                ],
-                            }
-                        ],
-                    )
-                    return (
-                        response.choices[0].message.content
-                        if hasattr(response.choices[0].message, "content")
-                        else str(response)
-                    )
+                    return ocr_image(client, file_bytes, mime=file_type, max_tokens=512)
                 except Exception as e:
                     return f"OCR API call failed: {e}"
         elif file_type == "application/pdf":
-            # Process all pages
+            # Rasterize pages in a process pool, then OCR them concurrently
             try:
-                with tempfile.NamedTemporaryFile(
-                    delete=False, suffix=".pdf"
-                ) as tmp_pdf:
-                    tmp_pdf.write(file_bytes)
-                    tmp_pdf.flush()
-                    doc = fitz.open(tmp_pdf.name)
-                    num_pages = doc.page_count
-                    results = []
-                    progress = st.progress(0, text="Processing PDF pages...")
-                    for i in range(num_pages):
-                        page = doc.load_page(i)
-                        pix = page.get_pixmap()
-                        img_bytes = pix.tobytes("png")
-                        b64_data = base64.b64encode(img_bytes).decode()
-                        mime = "image/png"
-                        try:
-                            response = client.chat.completions.create(
-                                model="google/gemma-3-27b-it",
-                                # max_tokens=512,
-                                temperature=0.5,
-                                top_p=0.9,
-                                extra_body={"top_k": 50},
-                                messages=[
-                                    {
-                                        "role": "user",
-                                        "content": [
-                                            {
-                                                "type": "text",
-                                                "text": "Extract the Details and use Tables where applicable",
-                                            },
-                                            {
-                                                "type": "image_url",
-                                                "image_url": {
-                                                    "url": f"data:{mime};base64,{b64_data}"
-                                                },
-                                            },
-                                        ],
-                                    }
-                                ],
-                            )
-                            text = (
-                                response.choices[0].message.content
-                                if hasattr(response.choices[0].message, "content")
-                                else str(response)
-                            )
-                        except Exception as e:
-                            text = f"OCR API call failed on page {i+1}: {e}"
-                        results.append(text)
-                        progress.progress(
-                            (i + 1) / num_pages,
-                            text=f"Processed {i+1} of {num_pages} pages...",
-                        )
-                    progress.empty()
-                    return "\n\n".join(results)
+                with st.spinner("Rendering PDF pages..."):
+                    images = rasterize_pdf(file_bytes)
             except Exception as e:
                 return f"PDF to image conversion failed: {e}"
+            progress = st.progress(0, text="Processing PDF pages...")
+            results = ocr_pages(
+                client,
+                images,
+                on_page_done=lambda done, total: progress.progress(
+                    done / total,
+                    text=f"Processed {done} of {total} pages...",
+                ),
+            )
+            progress.empty()
+            return "\n\n".join(results)
         else:
             return "Unsupported file type for OCR."
 
@@ -0,0 +1,124 @@
+import base64
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+import fitz  # PyMuPDF for PDF to image
+
+OCR_MODEL = "google/gemma-3-27b-it"
+OCR_PROMPT = "Extract the Details and use Tables where applicable"
+
+# Concurrent OCR requests in flight per document
+OCR_CONCURRENCY = int(os.getenv("OCR_CONCURRENCY", "4"))
+# Pages rasterized per worker process task; short PDFs are rasterized in-process
+PAGES_PER_TASK = 8
+PARALLEL_MIN_PAGES = 4
+# OCR results are cached on disk by page image hash
+OCR_CACHE_DIR = os.getenv("OCR_CACHE_DIR", ".ocr_cache")
+
+
+def rasterize_page_range(args):
+    """Render pages [start, end) of a PDF to PNG bytes; runs in a worker process."""
+    data, start, end = args
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        return [doc.load_page(i).get_pixmap().tobytes("png") for i in range(start, end)]
+
+
+def rasterize_pdf(data):
+    """Return one PNG per page, in page order."""
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        page_count = doc.page_count
+    if page_count < PARALLEL_MIN_PAGES:
+        return rasterize_page_range((data, 0, page_count))
+
+    ranges = [(data, start, min(start + PAGES_PER_TASK, page_count)) for start in range(0, page_count, PAGES_PER_TASK)]
+    images = []
+    with ProcessPoolExecutor(max_workers=min(len(ranges), os.cpu_count() or 1)) as executor:
+        for chunk in executor.map(rasterize_page_range, ranges):
+            images.extend(chunk)
+    return images
+
+
+def image_key(image_bytes, max_tokens=None):
+    digest = hashlib.sha256()
+    digest.update(f"{OCR_MODEL}\n{OCR_PROMPT}\n{max_tokens}\n".encode("utf-8"))
+    digest.update(image_bytes)
+    return digest.hexdigest()
+
+
+def read_cached(key):
+    path = os.path.join(OCR_CACHE_DIR, f"{key}.md")
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    return None
+
+
+def write_cached(key, text):
+    os.makedirs(OCR_CACHE_DIR, exist_ok=True)
+    path = os.path.join(OCR_CACHE_DIR, f"{key}.md")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def ocr_image(client, image_bytes, mime="image/png", max_tokens=None):
+    """OCR a single image, serving repeated images from the on-disk cache."""
+    key = image_key(image_bytes, max_tokens)
+    cached = read_cached(key)
+    if cached is not None:
+        return cached
+
+    b64_data = base64.b64encode(image_bytes).decode()
+    options = {"max_tokens": max_tokens} if max_tokens else {}
+    response = client.chat.completions.create(
+        model=OCR_MODEL,
+        temperature=0.5,
+        top_p=0.9,
+        extra_body={"top_k": 50},
+        messages=[
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "text",
+                        "text": OCR_PROMPT,
+                    },
+                    {
+                        "type": "image_url",
+                        "image_url": {
+                            "url": f"data:{mime};base64,{b64_data}"
+                        },
+                    },
+                ],
+            }
+        ],
+        **options,
+    )
+    message = response.choices[0].message
+    text = message.content if hasattr(message, "content") else str(response)
+    # Empty or missing output is likely a transient failure; only cache real text
+    if isinstance(text, str) and text.strip():
+        write_cached(key, text)
+    return text or ""
+
+
+def ocr_pages(client, images, on_page_done=None, concurrency=OCR_CONCURRENCY):
+    """
+    OCR page images with at most `concurrency` requests in flight and return the texts in page order.
+    A failed page yields an error line instead of failing the whole document.
+    on_page_done(done, total) is called from the calling thread as pages finish.
+    """
+    results = [None] * len(images)
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="ocr") as executor:
+        futures = {executor.submit(ocr_image, client, image): i for i, image in enumerate(images)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            i = futures[future]
+            try:
+                results[i] = future.result()
+            except Exception as e:
+                results[i] = f"OCR API call failed on page {i+1}: {e}"
+            if on_page_done:
+                on_page_done(done, len(images))
+    return results
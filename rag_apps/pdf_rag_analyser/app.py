@@ -1,7 +1,7 @@
 import streamlit as st
-from PyPDF2 import PdfReader
 import pandas as pd
 import base64
+import hashlib
 
 import os
 
@@ -21,30 +21,41 @@ from langchain.prompts import PromptTemplate
 
 from datetime import datetime
 
-def get_pdf_text(pdf_docs):
-    text = ""
-    for pdf in pdf_docs:
-        pdf_reader = PdfReader(pdf)
-        for page in pdf_reader.pages:
-            text += page.extract_text()
-    return text
-
-def get_text_chunks(text, model_name):
-    # Default values for text splitter
-    chunk_size = 10000
-    chunk_overlap = 1000
+# The worker runs in a process pool, so it lives in an importable module
+from pdf_extraction import extract_pages
+
+CHUNK_SIZE = 10000
+CHUNK_OVERLAP = 1000
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def extract_pdf_pages(digest, _data):
+    """Return [(page_number, text)] for a PDF, cached by content hash."""
+    return extract_pages(_data)
+
+def get_pdf_pages(pdf):
+    return extract_pdf_pages(file_hash(pdf), pdf.getvalue())
+
+def get_page_chunks(pdf, model_name):
+    """Split a PDF page by page, keeping source file and page number as chunk metadata for citations."""
+    pages = [(page_number, text) for page_number, text in get_pdf_pages(pdf) if text.strip()]
+    if not pages:
+        return [], []
+    text_splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+    documents = text_splitter.create_documents(
+        [text for _, text in pages],
+        metadatas=[{"source": pdf.name, "page": page_number} for page_number, _ in pages],
+    )
+    return [doc.page_content for doc in documents], [doc.metadata for doc in documents]
 
-    if model_name == "Google AI":
-        # Google AI specific settings could go here if needed
-        pass
-    # Add conditions for other models here if needed
+INDEX_DIR = "faiss_index"
+# Bump when chunking or chunk metadata changes so indexes built by older versions are not reused
+# (v1 indexes were whole-document chunks without page metadata)
+INDEX_FORMAT = "v2"
 
-    text_splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
-    chunks = text_splitter.split_text(text)
-    return chunks
+def file_hash(pdf):
+    return hashlib.sha256(pdf.getvalue()).hexdigest()
 
-def get_vector_store(text_chunks, model_name, api_key=None):
-    # Initialize embeddings
+def get_embeddings(model_name, api_key=None):
     embeddings = None
 
     if model_name == "Google AI":
@@ -53,11 +64,42 @@ def get_vector_store(text_chunks, model_name, api_key=None):
 
     if embeddings is None:
         raise ValueError(f"Model '{model_name}' is not supported")
+    return embeddings
 
-    vector_store = FAISS.from_texts(text_chunks, embedding=embeddings)
-    vector_store.save_local("faiss_index")
+def get_vector_store(text_chunks, model_name, api_key=None, index_path=INDEX_DIR, metadatas=None):
+    embeddings = get_embeddings(model_name, api_key)
+    vector_store = FAISS.from_texts(text_chunks, embedding=embeddings, metadatas=metadatas)
+    vector_store.save_local(index_path)
     return vector_store
 
+@st.cache_resource(show_spinner=False)
+def load_vector_store(file_hashes, model_name, api_key, _pdf_docs):
+    """
+    Build the FAISS index for an upload set once. Each PDF gets its own index on disk
+    (keyed by content hash), so only files that were never seen before are embedded.
+    """
+    embeddings = get_embeddings(model_name, api_key)
+    pdfs_by_hash = {file_hash(pdf): pdf for pdf in _pdf_docs}
+    combined = None
+    for digest in file_hashes:
+        index_path = os.path.join(INDEX_DIR, INDEX_FORMAT, model_name.replace(" ", "_").lower(), digest)
+        if os.path.exists(index_path):
+            vector_store = FAISS.load_local(index_path, embeddings, allow_dangerous_deserialization=True)
+        else:
+            text_chunks, metadatas = get_page_chunks(pdfs_by_hash[digest], model_name)
+            if not text_chunks:
+                continue
+            vector_store = get_vector_store(text_chunks, model_name, api_key, index_path, metadatas)
+        if combined is None:
+            combined = vector_store
+        else:
+            combined.merge_from(vector_store)
+    return combined
+
+def get_upload_vector_store(pdf_docs, model_name, api_key):
+    file_hashes = tuple(sorted({file_hash(pdf) for pdf in pdf_docs}))
+    return load_vector_store(file_hashes, model_name, api_key, pdf_docs)
+
 def get_conversational_chain(model_name, vectorstore=None, api_key=None):
     if model_name == "Google AI":
         prompt_template ="""
@@ -87,18 +129,23 @@ def user_input(user_question, model_name, api_key, pdf_docs, conversation_histor
     if api_key is None or pdf_docs is None:
         st.warning("Please upload PDF files and provide API key before processing.")
         return
-    text_chunks = get_text_chunks(get_pdf_text(pdf_docs), model_name)
-    vector_store = get_vector_store(text_chunks, model_name, api_key)
+    # Index is built once per upload set and reused for every question
+    new_db = get_upload_vector_store(pdf_docs, model_name, api_key)
+    if new_db is None:
+        st.warning("The uploaded PDFs contain no extractable text.")
+        return
     user_question_output = ""
     response_output = ""
+    sources_html = ""
     if model_name == "Google AI":
-        embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001", google_api_key=api_key)
-        new_db = FAISS.load_local("faiss_index", embeddings, allow_dangerous_deserialization=True)
         docs = new_db.similarity_search(user_question)
         chain = get_conversational_chain("Google AI", vectorstore=new_db, api_key=api_key)
         response = chain({"input_documents": docs, "question": user_question}, return_only_outputs=True)
         user_question_output = user_question
         response_output = response['output_text']
+        sources = sorted({(doc.metadata.get("source"), doc.metadata.get("page")) for doc in docs if doc.metadata.get("page")})
+        if sources:
+            sources_html = "<div class=\"info\">Sources: " + ", ".join(f"{source} p.{page}" for source, page in sources) + "</div>"
         pdf_names = [pdf.name for pdf in pdf_docs] if pdf_docs else []
         conversation_history.append((user_question_output, response_output, model_name, datetime.now().strftime('%Y-%m-%d %H:%M:%S'), ", ".join(pdf_names)))
 
@@ -150,7 +197,7 @@ def user_input(user_question, model_name, api_key, pdf_docs, conversation_histor
             <div class="avatar">
                 <img src="https://i.ibb.co/wNmYHsx/langchain-logo.webp" >
             </div>
-            <div class="message">{response_output}</div>
+            <div class="message">{response_output}{sources_html}</div>
             </div>
             
         """,
@@ -257,9 +304,8 @@ def main():
             if pdf_docs:
                 with st.spinner("Processing..."):
                     try:
-                        # Validate that PDFs can be processed
-                        test_text = get_pdf_text(pdf_docs[:1])  # Test with first PDF
-                        if not test_text.strip():
+                        # Build (or load) the index now so questions only pay for retrieval
+                        if get_upload_vector_store(pdf_docs, model_name, api_key) is None:
                             st.warning("PDF appears to be empty or contains no extractable text")
                         else:
                             st.success("Done")
@@ -0,0 +1,30 @@
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from PyPDF2 import PdfReader
+
+# PDFs with fewer pages than this are extracted in-process
+PARALLEL_MIN_PAGES = 20
+PAGES_PER_TASK = 25
+
+
+def extract_page_range(args):
+    """Extract (page_number, text) for pages [start, end) of a PDF; runs in a worker process."""
+    data, start, end = args
+    pdf_reader = PdfReader(io.BytesIO(data))
+    return [(i + 1, pdf_reader.pages[i].extract_text() or "") for i in range(start, end)]
+
+
+def extract_pages(data):
+    """Return [(page_number, text)] for every page of a PDF, in page order."""
+    page_count = len(PdfReader(io.BytesIO(data)).pages)
+    if page_count < PARALLEL_MIN_PAGES:
+        return extract_page_range((data, 0, page_count))
+
+    ranges = [(data, start, min(start + PAGES_PER_TASK, page_count)) for start in range(0, page_count, PAGES_PER_TASK)]
+    pages = []
+    with ProcessPoolExecutor(max_workers=min(len(ranges), os.cpu_count() or 1)) as executor:
+        for chunk in executor.map(extract_page_range, ranges):
+            pages.extend(chunk)
+    return pages
@@ -1,40 +1,67 @@
 import streamlit as st
 import os
-from llama_index.core import SimpleDirectoryReader, Settings, VectorStoreIndex
+from llama_index.core import SimpleDirectoryReader, Settings, VectorStoreIndex, StorageContext, load_index_from_storage
 from llama_index.embeddings.nebius import NebiusEmbedding
 from llama_index.llms.nebius import NebiusLLM
 from dotenv import load_dotenv
 import tempfile
 import shutil
 import base64
+import hashlib
 import io
 import re
 
 # Load environment variables
 load_dotenv()
 
-def run_rag_completion(
-    documents,
-    query_text: str,
-    embedding_model: str = "BAAI/bge-en-icl",
-    generative_model: str = "Qwen/Qwen3-235B-A22B"
-) -> str:
-    """Run RAG completion using Nebius models."""
-    llm = NebiusLLM(
+# Persisted indexes live under INDEX_DIR/<embedding model>/<sha256 of the PDF>
+INDEX_DIR = ".pdf_index"
+
+def file_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+@st.cache_resource
+def get_llm(generative_model: str):
+    return NebiusLLM(
         model=generative_model,
         api_key=os.getenv("NEBIUS_API_KEY")
     )
 
-    embed_model = NebiusEmbedding(
+@st.cache_resource
+def get_embed_model(embedding_model: str):
+    return NebiusEmbedding(
         model_name=embedding_model,
         api_key=os.getenv("NEBIUS_API_KEY")
     )
-    
+
+@st.cache_resource(show_spinner=False)
+def load_pdf_index(pdf_hash: str, embedding_model: str, _file_path: str):
+    """
+    Load the index for a PDF from disk, or read, embed and persist it.
+    Keyed by content hash, so re-uploading the same PDF never re-embeds it.
+    """
+    embed_model = get_embed_model(embedding_model)
+    persist_dir = os.path.join(INDEX_DIR, embedding_model.replace("/", "__"), pdf_hash)
+    if os.path.exists(persist_dir):
+        return load_index_from_storage(
+            StorageContext.from_defaults(persist_dir=persist_dir),
+            embed_model=embed_model
+        )
+
+    documents = SimpleDirectoryReader(input_files=[_file_path]).load_data()
+    index = VectorStoreIndex.from_documents(documents, embed_model=embed_model)
+    index.storage_context.persist(persist_dir=persist_dir)
+    return index
+
+def run_rag_completion(
+    index,
+    query_text: str,
+    generative_model: str = "Qwen/Qwen3-235B-A22B"
+) -> str:
+    """Run RAG completion over an already built index using Nebius models."""
+    llm = get_llm(generative_model)
     Settings.llm = llm
-    Settings.embed_model = embed_model
-    
-    index = VectorStoreIndex.from_documents(documents)
-    response = index.as_query_engine(similarity_top_k=5).query(query_text)
+    response = index.as_query_engine(llm=llm, similarity_top_k=5).query(query_text)
     
     return str(response)
 
@@ -164,10 +191,13 @@ def main():
                         f.write(uploaded_file.getbuffer())
                     
                     with st.spinner("Loading PDF..."):
-                        # Load documents from temp directory
-                        documents = SimpleDirectoryReader(st.session_state.temp_dir).load_data()
+                        # Load the persisted index for this PDF, or build it on first upload
+                        st.session_state.index = load_pdf_index(
+                            file_hash(uploaded_file.getvalue()),
+                            "BAAI/bge-en-icl",  # Fixed embedding model
+                            file_path
+                        )
                         st.session_state.docs_loaded = True
-                        st.session_state.documents = documents
                         st.success("✓ PDF loaded successfully")
                         
                         # Display PDF preview
@@ -199,9 +229,8 @@ def main():
             with st.spinner("Thinking..."):
                 try:
                     response = run_rag_completion(
-                        st.session_state.documents,
+                        st.session_state.index,
                         prompt,
-                        "BAAI/bge-en-icl",  # Fixed embedding model
                         generative_model
                     )
                     st.session_state.messages.append({"role": "assistant", "content": response})
@@ -1,43 +1,23 @@
 import streamlit as st
 import os
-from llama_index.core import SimpleDirectoryReader, Settings, VectorStoreIndex
+from llama_index.core import SimpleDirectoryReader, Settings, VectorStoreIndex, StorageContext, load_index_from_storage
 from llama_index.embeddings.nebius import NebiusEmbedding
 from llama_index.llms.nebius import NebiusLLM
 from dotenv import load_dotenv
 import tempfile
 import shutil
 import base64
+import hashlib
 from PyPDF2 import PdfReader
 import io
 
 # Load environment variables
 load_dotenv()
 
-def run_rag_completion(
-    documents,
-    query_text: str,
-    job_title: str,
-    job_description: str,
-    embedding_model: str = "BAAI/bge-en-icl",
-    generative_model: str = "Qwen/Qwen3-235B-A22B"
-) -> str:
-    """Run RAG completion using Nebius models for resume optimization."""
-    try:
-        llm = NebiusLLM(
-            model=generative_model,
-            api_key=os.getenv("NEBIUS_API_KEY")
-        )
+# Persisted indexes live under INDEX_DIR/<embedding model>/<sha256 of the resume>
+INDEX_DIR = ".resume_index"
 
-        embed_model = NebiusEmbedding(
-            model_name=embedding_model,
-            api_key=os.getenv("NEBIUS_API_KEY")
-        )
-        
-        Settings.llm = llm
-        Settings.embed_model = embed_model
-        
-        # Step 1: Analyze the resume
-        analysis_prompt = f"""
+ANALYSIS_PROMPT = """
         Analyze this resume in detail. Focus on:
         1. Key skills and expertise
         2. Professional experience and achievements
@@ -47,9 +27,64 @@ def run_rag_completion(
         
         Provide a concise analysis in bullet points.
         """
+
+def file_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+@st.cache_resource
+def get_llm(generative_model: str):
+    return NebiusLLM(
+        model=generative_model,
+        api_key=os.getenv("NEBIUS_API_KEY")
+    )
+
+@st.cache_resource
+def get_embed_model(embedding_model: str):
+    return NebiusEmbedding(
+        model_name=embedding_model,
+        api_key=os.getenv("NEBIUS_API_KEY")
+    )
+
+@st.cache_resource(show_spinner=False)
+def load_resume_index(resume_hash: str, embedding_model: str, _file_path: str):
+    """
+    Load the index for a resume from disk, or read, embed and persist it.
+    Keyed by content hash, so re-uploading the same resume never re-embeds it.
+    """
+    embed_model = get_embed_model(embedding_model)
+    persist_dir = os.path.join(INDEX_DIR, embedding_model.replace("/", "__"), resume_hash)
+    if os.path.exists(persist_dir):
+        return load_index_from_storage(
+            StorageContext.from_defaults(persist_dir=persist_dir),
+            embed_model=embed_model
+        )
+
+    documents = SimpleDirectoryReader(input_files=[_file_path]).load_data()
+    index = VectorStoreIndex.from_documents(documents, embed_model=embed_model)
+    index.storage_context.persist(persist_dir=persist_dir)
+    return index
+
+@st.cache_data(show_spinner=False)
+def analyze_resume(resume_hash: str, generative_model: str, _index) -> str:
+    """The analysis step does not depend on the job, so it runs once per resume and model."""
+    llm = get_llm(generative_model)
+    return str(_index.as_query_engine(llm=llm, similarity_top_k=5).query(ANALYSIS_PROMPT))
+
+def run_rag_completion(
+    index,
+    resume_hash: str,
+    query_text: str,
+    job_title: str,
+    job_description: str,
+    generative_model: str = "Qwen/Qwen3-235B-A22B"
+) -> str:
+    """Run RAG completion over an already built index using Nebius models for resume optimization."""
+    try:
+        llm = get_llm(generative_model)
+        Settings.llm = llm
         
-        index = VectorStoreIndex.from_documents(documents)
-        resume_analysis = index.as_query_engine(similarity_top_k=5).query(analysis_prompt)
+        # Step 1: Analyze the resume
+        resume_analysis = analyze_resume(resume_hash, generative_model, index)
         
         # Step 2: Generate optimization suggestions
         optimization_prompt = f"""
@@ -80,7 +115,7 @@ def run_rag_completion(
         Keep all points concise and actionable. Do not include any thinking process or analysis.
         """
         
-        optimization_suggestions = index.as_query_engine(similarity_top_k=5).query(optimization_prompt)
+        optimization_suggestions = index.as_query_engine(llm=llm, similarity_top_k=5).query(optimization_prompt)
         
         return str(optimization_suggestions)
     except Exception as e:
@@ -156,9 +191,14 @@ def main():
                         f.write(uploaded_file.getbuffer())
                     
                     with st.spinner("Loading Resume..."):
-                        documents = SimpleDirectoryReader(st.session_state.temp_dir).load_data()
+                        # Load the persisted index for this resume, or build it on first upload
+                        st.session_state.resume_hash = file_hash(uploaded_file.getvalue())
+                        st.session_state.index = load_resume_index(
+                            st.session_state.resume_hash,
+                            "BAAI/bge-en-icl",
+                            file_path
+                        )
                         st.session_state.docs_loaded = True
-                        st.session_state.documents = documents
                         st.success("✓ Resume loaded successfully")
                         display_pdf_preview(uploaded_file)
                 except Exception as e:
@@ -208,11 +248,11 @@ def main():
             with st.spinner("Analyzing resume and generating suggestions..."):
                 try:
                     response = run_rag_completion(
-                        st.session_state.documents,
+                        st.session_state.index,
+                        st.session_state.resume_hash,
                         prompts[optimization_type],
                         job_title,
                         job_description,
-                        "BAAI/bge-en-icl",
                         generative_model
                     )
                     # Remove think tags from response
@@ -1,9 +1,11 @@
 import os
 import json
 import re
-from langchain_nebius import ChatNebius
+from functools import lru_cache
+from langchain_nebius import ChatNebius, NebiusEmbeddings
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
+from query_cache import SQLCache
 
 # Database schema information
 DB_SCHEMA = """
@@ -38,9 +40,32 @@ def get_llm():
     )
 
 
-def translate_to_sql(natural_question):
-    """Translate natural language question to SQL using Qwen from Nebius"""
+@lru_cache(maxsize=1)
+def get_sql_cache():
+    """Get the persistent SQL cache; near-duplicate lookup is enabled with SQL_CACHE_SEMANTIC=1"""
+    embed_fn = None
+    if os.getenv("SQL_CACHE_SEMANTIC", "0") == "1":
+        embeddings = NebiusEmbeddings(
+            model="BAAI/bge-en-icl",
+            api_key=os.getenv("NEBIUS_API_KEY"),
+        )
+        embed_fn = embeddings.embed_query
+    return SQLCache(embed_fn=embed_fn)
+
+
+def translate_to_sql(natural_question, db_schema=None, use_cache=True):
+    """Translate natural language question to SQL using Qwen from Nebius
+
+    db_schema is the live schema description; falls back to DB_SCHEMA when not provided.
+    Repeated questions against the same schema are answered from the SQL cache.
+    """
+    db_schema = db_schema or DB_SCHEMA
     try:
+        if use_cache:
+            cached_sql = get_sql_cache().get(natural_question, db_schema)
+            if cached_sql:
+                return cached_sql
+
         # Initialize Qwen from Nebius
         llm = get_llm()
 
@@ -88,7 +113,7 @@ IMPORTANT: Return ONLY the SQL query without any prefix like "SQL:" or explanati
         # Generate SQL
         sql_query = chain.invoke(
             {
-                "db_schema": DB_SCHEMA,
+                "db_schema": db_schema,
                 "question": natural_question,
             }
         )
@@ -108,6 +133,9 @@ IMPORTANT: Return ONLY the SQL query without any prefix like "SQL:" or explanati
         # Clean up any remaining whitespace and newlines
         sql_query = sql_query.strip()
 
+        if use_cache and sql_query:
+            get_sql_cache().put(natural_question, db_schema, sql_query)
+
         return sql_query
 
     except Exception as e:
@@ -1,11 +1,10 @@
 import streamlit as st
 import os
-import pandas as pd
 from dotenv import load_dotenv
 import base64
 
 # Import functionality from separate modules
-from database import parse_connection_string, execute_query
+from database import parse_connection_string, execute_query, get_schema_description, check_query_cost
 from ai_services import translate_to_sql, explain_results
 
 # Load environment variables
@@ -110,11 +109,12 @@ def main():
             return
 
         with st.spinner("Translating your question to SQL..."):
-            sql_query = translate_to_sql(question)
+            sql_query = translate_to_sql(question, get_schema_description())
 
             if sql_query and not sql_query.startswith("Error"):
                 st.session_state.generated_sql = sql_query
                 st.session_state.current_question = question
+                st.session_state.query_gate = None
                 st.success("SQL query generated successfully!")
             else:
                 st.error(f"Failed to generate SQL query: {sql_query}")
@@ -126,15 +126,47 @@ def main():
         st.code(st.session_state.generated_sql, language="sql")
 
         if st.button("▶️ Execute Query", type="secondary"):
+            with st.spinner("Estimating query cost..."):
+                st.session_state.query_gate = check_query_cost(st.session_state.generated_sql)
+            st.session_state.query_confirmed = st.session_state.query_gate["action"] == "allow"
+
+        gate = st.session_state.get("query_gate")
+        if gate and gate["action"] == "reject":
+            st.error(f"Query rejected: {gate['reason']}. Refine your question to narrow it down.")
+        elif gate and gate["action"] == "confirm" and not st.session_state.get("query_confirmed"):
+            st.warning(f"This query may be expensive: {gate['reason']}.")
+            if st.button("⚠️ Run anyway"):
+                st.session_state.query_confirmed = True
+                st.rerun()
+
+        if gate and gate["action"] != "reject" and st.session_state.get("query_confirmed"):
+            st.session_state.query_confirmed = False
+            st.session_state.query_gate = None
+            if gate["limit_injected"]:
+                st.caption("A LIMIT was added to protect the database:")
+                st.code(gate["sql"], language="sql")
+
+            preview = st.empty()
+            progress = st.empty()
+
+            def show_page(page, stats):
+                # Render the first page as soon as it arrives; later pages only update the count
+                if stats["rows"] == len(page):
+                    preview.dataframe(page, use_container_width=True)
+                progress.caption(f"Fetched {stats['rows']:,} rows...")
+
             with st.spinner("Executing query..."):
-                results, error = execute_query(st.session_state.generated_sql)
+                results, stats, error = execute_query(gate["sql"], on_page=show_page)
 
-                if error:
-                    st.error(error)
-                else:
-                    st.session_state.query_results = results
-                    st.session_state.query_error = None
-                    st.success("Query executed successfully!")
+            preview.empty()
+            progress.empty()
+            if error:
+                st.error(error)
+            else:
+                st.session_state.query_results = results
+                st.session_state.query_stats = stats
+                st.session_state.query_error = None
+                st.success("Query executed successfully!")
 
     # Results section
     if (
@@ -145,17 +177,22 @@ def main():
         st.header("📊 Query Results")
 
         # Display results as DataFrame
-        df = pd.DataFrame(st.session_state.query_results)
+        df = st.session_state.query_results
         st.dataframe(df, use_container_width=True)
 
-        # Show result count
-        st.info(f"Found {len(df)} results")
+        # Show result count and fetch time
+        stats = st.session_state.get("query_stats", {})
+        st.info(f"Found {len(df)} results in {stats.get('fetch_seconds', 0):.2f}s")
+        if stats.get("truncated"):
+            st.warning(
+                f"Result set was cut off after {len(df):,} rows. Add a LIMIT or filter to see specific rows."
+            )
 
         # Explain results in plain English
         if st.button("🤖 Explain Results"):
             with st.spinner("Generating explanation..."):
                 explanation = explain_results(
-                    st.session_state.query_results, st.session_state.current_question
+                    df.head(100).to_dict("records"), st.session_state.current_question
                 )
                 st.markdown("### 📝 Explanation")
                 st.write(explanation)
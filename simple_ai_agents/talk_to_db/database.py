@@ -1,7 +1,25 @@
+import json
+import os
+import queue
+import re
+import time
+from contextlib import contextmanager
+import pandas as pd
 import streamlit as st
 import pymysql
 from urllib.parse import urlparse
 
+POOL_SIZE = 5
+# Connections idle longer than this are pinged (and reconnected) before reuse
+POOL_PING_AFTER = 60
+SCHEMA_TTL = 600
+# Result sets are streamed in pages and cut off after MAX_ROWS rows
+PAGE_SIZE = 1000
+MAX_ROWS = 50000
+# EXPLAIN row estimates above CONFIRM need user confirmation, above REJECT the query is refused
+COST_GATE_CONFIRM_ROWS = int(os.getenv("COST_GATE_CONFIRM_ROWS", "1000000"))
+COST_GATE_REJECT_ROWS = int(os.getenv("COST_GATE_REJECT_ROWS", "100000000"))
+
 
 def parse_connection_string(connection_string):
     """Parse MySQL connection string and return database config"""
@@ -36,30 +54,278 @@ def get_database_config():
     return None
 
 
-def get_database_connection():
-    """Create and return a database connection"""
-    try:
-        db_config = get_database_config()
-        connection = pymysql.connect(**db_config)
+class ConnectionPool:
+    """Small LIFO pool of pymysql connections so queries skip the TLS handshake."""
+
+    def __init__(self, db_config, size=POOL_SIZE):
+        self.db_config = db_config
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    def _acquire(self):
+        try:
+            connection, last_used = self._idle.get_nowait()
+        except queue.Empty:
+            return pymysql.connect(**self.db_config)
+        if time.monotonic() - last_used > POOL_PING_AFTER:
+            connection.ping(reconnect=True)
         return connection
-    except Exception as e:
-        st.error(f"Database connection failed: {str(e)}")
+
+    def _release(self, connection):
+        try:
+            self._idle.put_nowait((connection, time.monotonic()))
+        except queue.Full:
+            connection.close()
+
+    @contextmanager
+    def connection(self):
+        connection = self._acquire()
+        try:
+            yield connection
+        except Exception:
+            # The connection may be broken or still hold an unread streamed result
+            # ("commands out of sync" for the next borrower), so never reuse it
+            if connection.open:
+                connection.close()
+            raise
+        else:
+            # Connections closed by the caller (e.g. an abandoned stream) are not reused
+            if connection.open:
+                self._release(connection)
+
+
+def _config_key(db_config):
+    return (db_config["host"], db_config["port"], db_config["user"], db_config["password"], db_config["database"])
+
+
+@st.cache_resource(show_spinner=False)
+def _get_pool(config_key):
+    host, port, user, password, database = config_key
+    return ConnectionPool({
+        "host": host,
+        "user": user,
+        "password": password,
+        "database": database,
+        "port": port,
+        "ssl": {"ssl": {}},
+        # Pooled connections must not keep a REPEATABLE READ snapshot between queries
+        "autocommit": True,
+    })
+
+
+def get_connection_pool():
+    """Return the connection pool for the configured database (shared across reruns)"""
+    db_config = get_database_config()
+    if not db_config:
         return None
+    return _get_pool(_config_key(db_config))
 
 
-def execute_query(sql_query):
-    """Execute SQL query and return results"""
+def execute_query(sql_query, max_rows=MAX_ROWS, page_size=PAGE_SIZE, on_page=None):
+    """Execute SQL query with a server-side cursor and return (DataFrame, stats, error)
+
+    Rows are fetched page by page into a DataFrame and fetching stops after max_rows.
+    on_page(page, stats) is called after each page, so the UI can render the first
+    page before the whole result set has arrived.
+    """
+    stats = {"rows": 0, "truncated": False, "first_page_seconds": None, "fetch_seconds": 0.0}
     try:
-        connection = get_database_connection()
-        if not connection:
-            return None, "Database connection failed"
+        pool = get_connection_pool()
+        if not pool:
+            return None, stats, "Database connection failed"
 
-        with connection.cursor(pymysql.cursors.DictCursor) as cursor:
+        start = time.perf_counter()
+        pages = []
+        with pool.connection() as connection:
+            cursor = connection.cursor(pymysql.cursors.SSCursor)
             cursor.execute(sql_query)
-            results = cursor.fetchall()
 
-        connection.close()
-        return results, None
+            if cursor.description is None:
+                # Statement without a result set
+                cursor.close()
+                stats["fetch_seconds"] = time.perf_counter() - start
+                return pd.DataFrame(), stats, None
+
+            columns = [column[0] for column in cursor.description]
+            while stats["rows"] < max_rows:
+                rows = cursor.fetchmany(min(page_size, max_rows - stats["rows"]))
+                if not rows:
+                    break
+                pages.append(pd.DataFrame.from_records(rows, columns=columns))
+                stats["rows"] += len(rows)
+                if stats["first_page_seconds"] is None:
+                    stats["first_page_seconds"] = time.perf_counter() - start
+                if on_page:
+                    on_page(pages[-1], stats)
+
+            if stats["rows"] >= max_rows and cursor.fetchone() is not None:
+                # Closing an unbuffered cursor would read the rest of the result set,
+                # so drop the connection instead
+                stats["truncated"] = True
+                connection.close()
+            else:
+                cursor.close()
+
+        df = pd.concat(pages, ignore_index=True) if pages else pd.DataFrame(columns=columns)
+        stats["fetch_seconds"] = time.perf_counter() - start
+        return df, stats, None
 
     except Exception as e:
-        return None, f"Query execution error: {str(e)}"
+        return None, stats, f"Query execution error: {str(e)}"
+
+
+_LIMIT_RE = re.compile(r"\bLIMIT\s+\d+(\s*(,|OFFSET)\s*\d+)?\s*$", re.IGNORECASE)
+# String literals are matched first so comment markers inside them are kept;
+# /*! ... */ executable comments and /*+ ... */ optimizer hints are kept too
+_SQL_TOKEN_RE = re.compile(
+    r"""('(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|`[^`]*`)"""
+    r"|(--(?=\s|$)[^\n]*|#[^\n]*|/\*(?![!+]).*?\*/)",
+    re.DOTALL,
+)
+
+
+# Trailing locking reads (FOR UPDATE / FOR SHARE ... / LOCK IN SHARE MODE); MySQL expects LIMIT before them
+_LOCK_CLAUSE = (
+    r"(?:FOR\s+(?:UPDATE|SHARE)(?:\s+OF\s+[\w`.$]+(?:\s*,\s*[\w`.$]+)*)?(?:\s+(?:NOWAIT|SKIP\s+LOCKED))?"
+    r"|LOCK\s+IN\s+SHARE\s+MODE)"
+)
+_LOCKING_RE = re.compile(rf"(?:\s+{_LOCK_CLAUSE})+\s*$", re.IGNORECASE)
+
+
+def strip_sql_comments(sql_query):
+    """Remove --, # and /* */ comments that are outside string literals and identifiers"""
+    return _SQL_TOKEN_RE.sub(lambda match: match.group(1) or " ", sql_query)
+
+
+def inject_limit(sql_query, limit=MAX_ROWS):
+    """Append a LIMIT to SELECT queries that have none; returns (sql, injected)"""
+    sql = strip_sql_comments(sql_query).strip().rstrip(";").strip()
+    locking = _LOCKING_RE.search(sql)
+    head, lock_clause = (sql[:locking.start()], locking.group().strip()) if locking else (sql, "")
+    if not re.match(r"^\(?\s*(SELECT|WITH)\b", head, re.IGNORECASE) or _LIMIT_RE.search(head):
+        return sql_query, False
+    # On its own line so it can never end up inside a comment
+    limited = f"{head}\nLIMIT {limit}"
+    return (f"{limited}\n{lock_clause}" if lock_clause else limited), True
+
+
+def estimate_rows_scanned(plan):
+    """Estimate rows examined from an EXPLAIN FORMAT=JSON plan
+
+    Within a nested loop every table is scanned once per row produced by the tables before it.
+    """
+    total = 0
+
+    def table_rows(table, key):
+        try:
+            return float(table.get(key) or 0)
+        except (TypeError, ValueError):
+            return 0.0
+
+    def walk(node):
+        nonlocal total
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if key == "nested_loop" and isinstance(value, list):
+                    driving_rows = 1.0
+                    for step in value:
+                        table = step.get("table", {}) if isinstance(step, dict) else {}
+                        total += driving_rows * table_rows(table, "rows_examined_per_scan")
+                        driving_rows = max(table_rows(table, "rows_produced_per_join"), 1.0)
+                        walk(table)
+                elif key == "table" and isinstance(value, dict):
+                    total += table_rows(value, "rows_examined_per_scan")
+                    walk(value)
+                else:
+                    walk(value)
+        elif isinstance(node, list):
+            for item in node:
+                walk(item)
+
+    walk(plan)
+    return int(total)
+
+
+def check_query_cost(sql_query):
+    """Run EXPLAIN FORMAT=JSON and decide whether the query may run
+
+    Returns a dict with action ("allow", "confirm" or "reject"), the SQL to run
+    (with a LIMIT injected if it had none), estimated_rows, query_cost and reason.
+    """
+    sql, limit_injected = inject_limit(sql_query)
+    gate = {
+        "action": "allow",
+        "sql": sql,
+        "limit_injected": limit_injected,
+        "estimated_rows": None,
+        "query_cost": None,
+        "reason": "",
+    }
+    try:
+        pool = get_connection_pool()
+        if not pool:
+            gate.update(action="reject", reason="Database connection failed")
+            return gate
+
+        with pool.connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN FORMAT=JSON {sql}")
+                plan = json.loads(cursor.fetchone()[0])
+    except Exception as e:
+        gate.update(action="confirm", reason=f"Could not estimate query cost: {str(e)}")
+        return gate
+
+    rows = estimate_rows_scanned(plan)
+    gate["estimated_rows"] = rows
+    gate["query_cost"] = plan.get("query_block", {}).get("cost_info", {}).get("query_cost")
+
+    if rows > COST_GATE_REJECT_ROWS:
+        gate.update(action="reject", reason=f"Estimated {rows:,} rows scanned exceeds the limit of {COST_GATE_REJECT_ROWS:,}")
+    elif rows > COST_GATE_CONFIRM_ROWS:
+        gate.update(action="confirm", reason=f"Estimated {rows:,} rows scanned")
+    return gate
+
+
+@st.cache_data(ttl=SCHEMA_TTL, show_spinner=False)
+def _introspect_schema(config_key):
+    pool = _get_pool(config_key)
+    database = config_key[4]
+    with pool.connection() as connection:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT TABLE_NAME, COLUMN_NAME FROM information_schema.COLUMNS "
+                "WHERE TABLE_SCHEMA = %s ORDER BY TABLE_NAME, ORDINAL_POSITION",
+                (database,),
+            )
+            columns = cursor.fetchall()
+            cursor.execute(
+                "SELECT TABLE_NAME, COLUMN_NAME, REFERENCED_TABLE_NAME, REFERENCED_COLUMN_NAME "
+                "FROM information_schema.KEY_COLUMN_USAGE "
+                "WHERE TABLE_SCHEMA = %s AND REFERENCED_TABLE_NAME IS NOT NULL "
+                "ORDER BY TABLE_NAME, COLUMN_NAME",
+                (database,),
+            )
+            relationships = cursor.fetchall()
+
+    tables = {}
+    for table, column in columns:
+        tables.setdefault(table, []).append(column)
+
+    lines = [f"Database: {database} (MySQL)", "Tables:"]
+    lines += [f"- {table} ({', '.join(cols)})" for table, cols in tables.items()]
+    if relationships:
+        lines += ["", "Relationships:"]
+        lines += [f"- {table}.{column} -> {ref_table}.{ref_column}" for table, column, ref_table, ref_column in relationships]
+    lines += ["", "Note: All tables use MySQL syntax with backticks for identifiers."]
+    return "\n".join(lines)
+
+
+def get_schema_description():
+    """Return the live schema (from information_schema, cached for SCHEMA_TTL seconds) or None"""
+    db_config = get_database_config()
+    if not db_config:
+        return None
+    try:
+        return _introspect_schema(_config_key(db_config))
+    except Exception as e:
+        st.warning(f"Could not introspect database schema: {str(e)}")
+        return None
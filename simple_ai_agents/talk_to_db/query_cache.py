@@ -0,0 +1,129 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+SQL_CACHE_FILE = os.getenv("SQL_CACHE_FILE", "sql_cache.db")
+# Cosine similarity above which a previously asked question is treated as the same question
+SIMILARITY_THRESHOLD = float(os.getenv("SQL_CACHE_SIMILARITY", "0.95"))
+# Lookup embeddings kept for the following put()
+RECENT_EMBEDDINGS = 64
+
+
+def normalize_question(question):
+    """
+    Lowercase, collapse whitespace and strip trailing ?/./! so trivial rephrasings share a key.
+    Operators, signs and quotes are kept: "orders > 100" and "orders < 100" need different SQL.
+    """
+    question = " ".join(question.lower().split())
+    return re.sub(r"[\s?.!]+$", "", question)
+
+
+def schema_fingerprint(db_schema):
+    return hashlib.sha256(db_schema.encode("utf-8")).hexdigest()[:16]
+
+
+class SQLCache:
+    """Persistent NL-to-SQL cache keyed by normalized question and schema fingerprint"""
+
+    def __init__(self, path=SQL_CACHE_FILE, embed_fn=None):
+        self.embed_fn = embed_fn
+        self._lock = threading.Lock()
+        # Embeddings computed by lookups that missed, reused when the new SQL is stored
+        self._recent_embeddings = OrderedDict()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS sql_cache (
+                question TEXT NOT NULL,
+                schema_hash TEXT NOT NULL,
+                sql TEXT NOT NULL,
+                embedding TEXT,
+                hits INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (question, schema_hash)
+            )"""
+        )
+        self._conn.commit()
+
+    def get(self, question, db_schema):
+        """Return cached SQL for the question, falling back to the nearest embedded question"""
+        key = normalize_question(question)
+        schema_hash = schema_fingerprint(db_schema)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT sql FROM sql_cache WHERE question = ? AND schema_hash = ?",
+                (key, schema_hash),
+            ).fetchone()
+        if row:
+            self._record_hit(key, schema_hash)
+            return row[0]
+
+        if self.embed_fn is None:
+            return None
+        return self._nearest(question, schema_hash)
+
+    def _nearest(self, question, schema_hash):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT question, sql, embedding FROM sql_cache WHERE schema_hash = ? AND embedding IS NOT NULL",
+                (schema_hash,),
+            ).fetchall()
+        if not rows:
+            return None
+
+        embedding = self._embed(question)
+        if embedding is None:
+            return None
+        query = np.asarray(embedding, dtype=np.float32)
+        matrix = np.asarray([json.loads(embedding) for _, _, embedding in rows], dtype=np.float32)
+        scores = matrix @ query / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(query) + 1e-10)
+        best = int(np.argmax(scores))
+        if scores[best] < SIMILARITY_THRESHOLD:
+            return None
+        self._record_hit(rows[best][0], schema_hash)
+        return rows[best][1]
+
+    def _embed(self, question):
+        """Embed a question, remembering the result for put(); None if embedding fails"""
+        key = normalize_question(question)
+        with self._lock:
+            embedding = self._recent_embeddings.get(key)
+        if embedding is not None:
+            return embedding
+        try:
+            embedding = [float(x) for x in self.embed_fn(question)]
+        except Exception:
+            return None
+        with self._lock:
+            self._recent_embeddings[key] = embedding
+            while len(self._recent_embeddings) > RECENT_EMBEDDINGS:
+                self._recent_embeddings.popitem(last=False)
+        return embedding
+
+    def put(self, question, db_schema, sql):
+        embedding = None
+        if self.embed_fn is not None:
+            vector = self._embed(question)
+            embedding = json.dumps(vector) if vector is not None else None
+            with self._lock:
+                self._recent_embeddings.pop(normalize_question(question), None)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sql_cache (question, schema_hash, sql, embedding, hits, created_at) "
+                "VALUES (?, ?, ?, ?, 0, ?)",
+                (normalize_question(question), schema_fingerprint(db_schema), sql, embedding, time.time()),
+            )
+
+    def _record_hit(self, key, schema_hash):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE sql_cache SET hits = hits + 1 WHERE question = ? AND schema_hash = ?",
+                (key, schema_hash),
+            )